@@ -0,0 +1,77 @@
+"""
+Micro-benchmark : article parsing, single pass parser (parsers.parse_article_html)
+v. the previous multi-queries path (css_first / css per selector, _clean twice per paragraph)
+
+    python -m benchmarks.bench_article_parser
+"""
+
+import json
+import re
+import timeit
+
+from selectolax.parser import HTMLParser
+
+from lmd_ukr.enums import Css
+from lmd_ukr.parsers import clean, parse_article_html, parse_metadata
+
+from .pages import article_page
+
+
+def get_css_first(html, selector):
+    try:
+        return html.css_first(selector).text()
+    except AttributeError:
+        return None
+
+
+def legacy_parse_article(html) -> dict:
+    """Api.get_article() parsing, before the single pass parser"""
+    title = clean(get_css_first(html, Css.A_TITLE.value))
+    desc = clean(get_css_first(html, Css.A_DESC.value))
+    content = " ".join(
+        [
+            clean(node.text())
+            for node in html.css(Css.A_CONTENT.value)
+            if clean(node.text()) is not None
+        ]
+    )
+    html_meta = html.css_first("script").text()
+    meta = json.loads(re.search("({.+})", html_meta).group(0))
+    allow_comments = [node.text() for node in html.css(Css.A_COMS_ALLOWED.value)]
+    return {
+        "title": title,
+        "desc": desc,
+        "content": content,
+        "allow_comments": True if allow_comments else False,
+        "meta": meta,
+    }
+
+
+def single_pass_parse_article(html) -> dict:
+    parsed = parse_article_html(html)
+    parsed["meta"] = parse_metadata(parsed.pop("script"))
+    return parsed
+
+
+def main(number: int = 2000):
+    pages = {n: HTMLParser(article_page(n_paragraphs=n)) for n in (10, 25, 60)}
+    print(f"{'paragraphs':>10} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}")
+    for n, html in pages.items():
+        legacy = legacy_parse_article(html)
+        single = single_pass_parse_article(html)
+        assert (legacy["title"], legacy["desc"], legacy["content"]) == (
+            single["title"],
+            single["desc"],
+            single["content"],
+        )
+        t_legacy = timeit.timeit(lambda: legacy_parse_article(html), number=number)
+        t_single = timeit.timeit(lambda: single_pass_parse_article(html), number=number)
+        print(
+            f"{n:>10} {t_legacy / number * 1000:>10.3f}"
+            f" {t_single / number * 1000:>10.3f}"
+            f" {t_legacy / t_single:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
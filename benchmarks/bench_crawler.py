@@ -0,0 +1,249 @@
+"""
+End-to-end crawler benchmark, offline : search, get_article and get_comments against the local
+fixture server (benchmarks/server.py), in each execution mode
+- sync : Api(max_workers=1), one url after the other
+- threaded : Api(max_workers=n), articles / comments of several articles in a pool of n threads
+- async : AsyncApi(max_per_host=n), everything gathered
+- pipeline : Pipeline (fetch threads + parse processes), no search
+
+Each (operation, mode) runs in a fresh process : peak rss is its own, and the client does not
+share the GIL with the server. Rate limits are lifted (Governor), the server only is timed,
+Governor cooldown after a 429 is the server Retry-After.
+
+    python -m benchmarks.bench_crawler
+    python -m benchmarks.bench_crawler --latency 0.05 --workers 16 --throttle-every 100
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import time
+import timeit
+
+from selectolax.parser import HTMLParser
+
+from lmd_ukr.api import Api, Article
+from lmd_ukr.async_api import AsyncApi
+from lmd_ukr.governor import Governor
+from lmd_ukr.parsers import parse_article, parse_comments_page, parse_search_page
+from lmd_ukr.pipeline import Pipeline
+
+from .pages import article_page, comments_page, search_page
+from .server import FixtureServer
+
+MODES = ("sync", "threaded", "async", "pipeline")
+OPERATIONS = ("search", "get_article", "get_comments")
+
+
+def article_urls(base: str, n: int) -> list[str]:
+    return [
+        f"{base}/international/article/2022/03/01/article-{k}_{6160000 + k}_3210.html"
+        for k in range(n)
+    ]
+
+
+def _articles(base: str, n: int) -> list[Article]:
+    return [
+        Article(
+            url=url,
+            title="title",
+            desc="desc",
+            content="content",
+            article_id=6160000 + k,
+            date="2022-03-01",
+            keywords=[],
+            article_type="Analyse",
+            allow_comments=True,
+            premium=True,
+        )
+        for k, url in enumerate(article_urls(base, n))
+    ]
+
+
+def _api(mode: str, search_url: str, workers: int, cooldown: float) -> Api:
+    unlimited = Governor(search=1e9, article=1e9, comments=1e9, cooldown=cooldown)
+    if mode == "async":
+        api = AsyncApi(
+            lmd_m="bench",
+            lmd_s="bench",
+            governor=unlimited,
+            max_per_host=workers,
+            max_connections=workers,
+        )
+    else:
+        max_workers = 1 if mode == "sync" else workers
+        api = Api(
+            lmd_m="bench", lmd_s="bench", governor=unlimited, max_workers=max_workers
+        )
+    api.searchUrl = search_url
+    return api
+
+
+def _safe(fn):
+    """Call fn, None if it fails (errors are counted, not raised)"""
+
+    def call(*args):
+        try:
+            return fn(*args)
+        except Exception:
+            return None
+
+    return call
+
+
+async def _asafe(coro):
+    try:
+        return await coro
+    except Exception:
+        return None
+
+
+def _run(
+    operation: str,
+    mode: str,
+    base: str,
+    search_url: str,
+    n: int,
+    workers: int,
+    cooldown: float,
+):
+    """Run operation in mode, return (items, results), items : args of each call"""
+    api = _api(mode, search_url, workers, cooldown)
+    if operation == "search":
+        items = [("ukraine", "01/03/2022", "08/03/2022")]
+    elif operation == "get_article":
+        items = [(url,) for url in article_urls(base, n)]
+    else:
+        items = [(article,) for article in _articles(base, n)]
+
+    if mode == "async":
+
+        async def main():
+            async with api:
+                call = getattr(api, operation)
+                return await asyncio.gather(*[_asafe(call(*args)) for args in items])
+
+        return items, asyncio.run(main())
+
+    if mode == "pipeline":
+        with Pipeline(api, processes=2, fetch_workers=workers) as pipeline:
+            if operation == "get_article":
+                return items, list(pipeline.articles([url for url, in items]))
+            return items, list(pipeline.comments([article for article, in items]))
+
+    call = _safe(getattr(api, operation))
+    if mode == "sync":
+        return items, [call(*args) for args in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return items, list(executor.map(lambda args: call(*args), items))
+
+
+def run_case(
+    operation: str,
+    mode: str,
+    base: str,
+    search_url: str,
+    n: int,
+    workers: int,
+    cooldown: float = 1,
+) -> dict:
+    """One benchmark case, in its own process : time, results, errors & peak rss"""
+    start = time.perf_counter()
+    try:
+        items, results = _run(operation, mode, base, search_url, n, workers, cooldown)
+        failure = None
+    except Exception as e:
+        items, results, failure = [], [], repr(e)
+    seconds = time.perf_counter() - start
+    if operation == "search":
+        found = sum(r.retrieved for r in results if r)
+    elif operation == "get_article":
+        found = sum(1 for r in results if r)
+    else:
+        found = sum(len(r) for r in results if r)
+    return {
+        "seconds": seconds,
+        "items": len(items),
+        "errors": sum(1 for r in results if r is None) if not failure else len(items),
+        "found": found,
+        "failure": failure,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def parse_ms(number: int = 200) -> dict:
+    """Parse cost (ms/page) of each page kind, no network"""
+    pages = {
+        "search": (lambda html: parse_search_page(html), search_page()),
+        "article": (
+            lambda html: parse_article("https://x/a.html", html),
+            article_page(),
+        ),
+        "comments": (lambda html: parse_comments_page(html), comments_page()),
+    }
+    return {
+        kind: timeit.timeit(lambda: parse(HTMLParser(page)), number=number)
+        / number
+        * 1000
+        for kind, (parse, page) in pages.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline crawler benchmark")
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="s per response")
+    parser.add_argument("--redirect-every", type=int, default=0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--search-pages", type=int, default=5)
+    parser.add_argument("--comments-pages", type=int, default=5)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--operations", default=",".join(OPERATIONS))
+    args = parser.parse_args()
+
+    costs = ", ".join(f"{kind} {ms:.3f}" for kind, ms in parse_ms().items())
+    print(f"parse ms/page (no network) : {costs}")
+    print(
+        f"{'operation':<13}{'mode':<10}{'s':>7}{'requests':>9}"
+        f"{'req/s':>8}{'pages/s':>8}"
+        f"{'found':>7}{'errors':>7}{'rss MB':>8}"
+    )
+    spawn = multiprocessing.get_context("spawn")
+    with FixtureServer(
+        latency=args.latency,
+        redirect_every=args.redirect_every,
+        throttle_every=args.throttle_every,
+        search_pages=args.search_pages,
+        comments_pages=args.comments_pages,
+    ) as server:
+        for operation in args.operations.split(","):
+            for mode in args.modes.split(","):
+                if mode == "pipeline" and operation == "search":
+                    continue
+                server.reset()
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                    case = executor.submit(
+                        run_case,
+                        operation,
+                        mode,
+                        server.url,
+                        server.search_url,
+                        args.articles,
+                        args.workers,
+                        server.retry_after,
+                    ).result()
+                requests = server.stats["requests"]
+                pages = server.stats["status_200"]
+                print(
+                    f"{operation:<13}{mode:<10}{case['seconds']:>7.2f}{requests:>9}"
+                    f"{requests / case['seconds']:>8.1f}{pages / case['seconds']:>8.1f}"
+                    f"{case['found']:>7}{case['errors']:>7}{case['peak_rss_mb']:>8.1f}"
+                    + (f"  {case['failure']}" if case["failure"] else "")
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Synthetic Le Monde like pages (search, article, ?contributions), matching Css selectors (enums.py)
+Used by benchmarks, no need for credentials nor network
+"""
+
+import json
+
+
+def metadata(article_id: int = 6160000, premium: bool = True) -> dict:
+    return {
+        "analytics": {
+            "smart_tag": {
+                "customObject": {
+                    "ID_Article": article_id,
+                    "Nature_edito": "Analyse",
+                    "Statut_article": "Abo" if premium else "Libre",
+                },
+                "tags": {"keywords": ["ukraine", "russie", "guerre en ukraine"]},
+            }
+        },
+        "context": {
+            "article": {"firstPublished": {"date": "2022-03-01 10:00:00.000000"}}
+        },
+    }
+
+
+def _boilerplate(n: int = 60) -> str:
+    """Navigation, teasers .. what an article page is mostly made of"""
+    return "".join(
+        f'<li class="menu__item"><a class="menu__link" href="/rubrique-{k}/">'
+        f"Rubrique {k}</a></li>"
+        for k in range(n)
+    )
+
+
+def article_page(
+    article_id: int = 6160000, n_paragraphs: int = 25, comments: bool = True
+) -> str:
+    paragraphs = "".join(
+        f'<p class="article__paragraph ">Paragraphe {k}, l’armée   russe a '
+        f"poursuivi ses frappes ; Kiev dénonce des crimes de guerre.</p>"
+        for k in range(n_paragraphs)
+    )
+    comments_node = (
+        '<a class="comments__active" href="?contributions">Voir les contributions</a>'
+        if comments
+        else '<p class="comments__blocked-btn">Commentaires fermés</p>'
+    )
+    return (
+        "<html><head>"
+        f"<script>var lmd = {json.dumps(metadata(article_id))};</script>"
+        '<script src="/bucket/app.js"></script>'
+        "</head><body>"
+        f'<nav><ul class="menu">{_boilerplate()}</ul></nav>'
+        "<main><article>"
+        '<h1 class="article__title">  Guerre en Ukraine : la contre-offensive </h1>'
+        '<p class="article__desc">Le point sur la situation, jour après jour.</p>'
+        f"{paragraphs}"
+        f"{comments_node}"
+        "</article></main>"
+        f'<footer><ul class="menu">{_boilerplate(30)}</ul></footer>'
+        "</body></html>"
+    )
+
+
+def comments_page(
+    page: int = 1, n_pages: int = 5, per_page: int = 20, count: int = 95
+) -> str:
+    start = (page - 1) * per_page
+    items = "".join(
+        f'<section class="comment"><span class="comment__author">Lecteur {k}</span>'
+        f'<p class="comment__content">Commentaire numéro {k}, '
+        "entièrement d’accord.</p>"
+        "</section>"
+        for k in range(start, min(start + per_page, count))
+    )
+    pagination = (
+        '<ul class="pagination__list">'
+        + "".join(
+            f'<li><a class="pagination__link" href="?page={p}">{p}</a></li>'
+            for p in range(1, n_pages + 1)
+        )
+        + "</ul>"
+    )
+    return (
+        "<html><body>"
+        f'<h3 class="comments__title">Contributions ({count})</h3>'
+        f"{items}{pagination}"
+        "</body></html>"
+    )
+
+
+def search_page(
+    page: int = 1,
+    n_pages: int = 3,
+    per_page: int = 40,
+    base: str = "https://www.lemonde.fr",
+) -> str:
+    items = "".join(
+        f'<section class="teaser"><a class="teaser__link" '
+        f'href="{base}/international/article/2022/03/01/'
+        f'article-{page}-{k}_{6160000 + page * 100 + k}_3210.html">'
+        f'<h3 class="teaser__title">Article {page}-{k}</h3></a></section>'
+        for k in range(per_page)
+    )
+    pagination = '<a class="river__pagination">Suivant</a>' + "".join(
+        f'<a class="river__pagination river__pagination--page-search">{p}</a>'
+        for p in range(1, n_pages + 1)
+    )
+    return f"<html><body>{items}{pagination}</body></html>"
@@ -0,0 +1,156 @@
+"""
+Local stand-in for lemonde.fr : serves synthetic search, article and ?contributions pages
+(benchmarks/pages.py, matching Css selectors) from a threaded http.server, in a background thread
+Faults can be injected : latency, 301 redirects (articles), 429 (any page)
+
+Usage:
+------
+with FixtureServer(latency=0.05, throttle_every=50) as server:
+    api = Api(lmd_m="x", lmd_s="x")
+    api.searchUrl = server.search_url
+    search = api.search("ukraine", "01/03/2022", "08/03/2022")
+    print(server.stats)
+"""
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import re
+import threading
+import time
+import urllib.parse
+
+from .pages import article_page, comments_page, search_page
+
+_ARTICLE_ID = re.compile(r"_(\d+)_\d+\.html$")
+
+
+class FixtureServer:
+    """Fixture server, on 127.0.0.1, random free port (cf. .url)
+    - latency : seconds slept before each response (requests are served concurrently)
+    - redirect_every : every n-th article request is a 301 to the same article (?v=2)
+    - throttle_every : every n-th request is a 429 (Retry-After: retry_after)
+    - search_pages / comments_pages / comments_per_page : size of the paginated results
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        redirect_every: int = 0,
+        throttle_every: int = 0,
+        retry_after: int = 1,
+        search_pages: int = 5,
+        comments_pages: int = 5,
+        comments_per_page: int = 20,
+    ):
+        self.latency = latency
+        self.redirect_every = redirect_every
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.search_pages = search_pages
+        self.comments_pages = comments_pages
+        self.comments_per_page = comments_per_page
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        """To be set as Api.searchUrl"""
+        return f"{self.url}/recherche/?"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def _count(self, *keys: str) -> int:
+        with self._lock:
+            for key in keys:
+                self.stats[key] += 1
+            return self.stats[keys[0]]
+
+    def route(self, path: str, query: dict, n: int) -> tuple[int, dict, str]:
+        """(status, headers, body) for a request, n-th request overall"""
+        if self.throttle_every and n % self.throttle_every == 0:
+            return 429, {"Retry-After": str(self.retry_after)}, "Too Many Requests"
+
+        page = int(query.get("page", ["1"])[0])
+        if path.startswith("/recherche"):
+            return 200, {}, search_page(page, n_pages=self.search_pages, base=self.url)
+
+        article_id = _ARTICLE_ID.search(path)
+        if not article_id:
+            return 404, {}, "Not Found"
+        if "contributions" in query:
+            count = self.comments_pages * self.comments_per_page
+            body = comments_page(
+                page,
+                n_pages=self.comments_pages,
+                per_page=self.comments_per_page,
+                count=count,
+            )
+            return 200, {}, body
+        if (
+            self.redirect_every
+            and "v" not in query
+            and self._count("article_requests") % self.redirect_every == 0
+        ):
+            return 301, {"Location": f"{self.url}{path}?v=2"}, ""
+        return 200, {}, article_page(int(article_id.group(1)))
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers & body are sent separately,
+            # don't wait for delayed ACKs (keep-alive)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                n = server._count("requests")
+                if server.latency:
+                    time.sleep(server.latency)
+                parsed = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+                status, headers, body = server.route(parsed.path, query, n)
+                payload = body.encode()
+                server._count(f"status_{status}")
+                with server._lock:
+                    server.stats["bytes"] += len(payload)
+
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (e.g. error on a previous page)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
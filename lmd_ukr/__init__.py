@@ -1 +1,2 @@
 from .api import Api
+from .async_api import AsyncApi
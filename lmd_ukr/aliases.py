@@ -0,0 +1,60 @@
+import sqlite3
+import threading
+
+
+class UrlAliases:
+    """Permanent redirects (301 / 308) seen by Api : url -> new url
+    Re-crawls of a moved article go straight to its new url, without the extra redirect round trip.
+    In memory by default, persisted in a small SQLite db if given a path (shared across runs).
+
+    Usage:
+    ------
+    api = Api(lmd_m=lmd_m, lmd_s=lmd_s, aliases=UrlAliases("data/aliases.db"))
+    """
+
+    def __init__(self, path: str | None = None):
+        self._lock = threading.Lock()
+        self._aliases = {}
+        self.conn = None
+        if path:
+            # timeout : the file may be shared by several processes (cf. lmd_ukr.worker)
+            self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            with self.conn:
+                self.conn.execute("""CREATE TABLE IF NOT EXISTS aliases (
+                    url text PRIMARY KEY,
+                    target text NOT NULL
+                    );""")
+            self._aliases = dict(self.conn.execute("SELECT url, target FROM aliases"))
+
+    def __repr__(self):
+        return f"UrlAliases({len(self)} urls)"
+
+    def __len__(self):
+        return len(self._aliases)
+
+    def resolve(self, url: str) -> str:
+        """Latest known url of url (alias chains are followed, loops ignored), url if none"""
+        seen = {url}
+        with self._lock:
+            while url in self._aliases and self._aliases[url] not in seen:
+                url = self._aliases[url]
+                seen.add(url)
+        return url
+
+    def add(self, url: str, target: str) -> None:
+        """Remember a permanent redirect of url to target"""
+        with self._lock:
+            if url == target or self._aliases.get(url) == target:
+                return
+            self._aliases[url] = target
+            if self.conn:
+                with self.conn:
+                    self.conn.execute(
+                        """INSERT INTO aliases (url, target) VALUES(?,?)
+                        ON CONFLICT(url) DO UPDATE SET target=excluded.target""",
+                        (url, target),
+                    )
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
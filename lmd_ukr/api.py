@@ -1,46 +1,36 @@
-from dataclasses import dataclass
-import re
-import json
-import unicodedata
+from dataclasses import asdict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import logging
+import threading
 import urllib.parse
 import time
-import random
+from datetime import datetime, timedelta
 
 import httpx
 from selectolax.parser import HTMLParser
 
-from .enums import Css
-
-
-@dataclass
-class Search:
-    query: str
-    url: str
-    is_result: bool
-    pages: int
-    retrieved: int
-    results: list
-
-
-@dataclass
-class Article:
-    url: str
-    title: str
-    desc: str
-    content: str
-    article_id: int
-    date: str
-    keywords: list[str]
-    article_type: str
-    allow_comments: bool
-    premium: bool
-
-
-@dataclass
-class Comments:
-    article_id: int
-    count: int
-    comments: list
+from .enums import Endpoint
+from .models import Search, Article, Comments, comment_ids
+from .governor import Governor
+from .store import HtmlStore
+from .validators import ValidatorIndex
+from .exceptions import FetchError, NotModified, NoResult, RateLimited, TooManyRedirects
+from .frontier import Frontier
+from .metrics import Metrics, Timing
+from .aliases import UrlAliases
+from .retry import Retry, retry_after
+from .parsers import (
+    clean,
+    find_metadata_script,
+    parse_metadata,
+    parse_search_probe,
+    parse_search_page,
+    parse_article,
+    parse_comments_probe,
+    parse_comments_page,
+)
 
 
 class Api:
@@ -52,10 +42,40 @@ class Api:
     ------------
     Do exist but obv. not documented. Being too harsh can lead to an temporary (at least?) IP ban of +- 45mn
     E.g. endpoint : ./recherche? keep < ~30 requests/mn. On articles & comments, if any, it's higher
+    Handled by a Governor (one token bucket per endpoint class, slows down on 429/503
+    or rising latency), pass your own Governor(search=.., article=.., comments=..) to tune it
+
+    Raw html store / replay:
+    ------------------------
+    Api(.., store=HtmlStore(path)) keeps every raw response on disk (compressed, content-addressed)
+    Api(store=HtmlStore(path), replay=True) parses from that store only, no network, no credentials
+
+    Conditional requests:
+    ---------------------
+    Api(.., validators=ValidatorIndex(path)) sends If-None-Match / If-Modified-Since on re-crawls,
+    a 304 returns the previously parsed Article / Comments (no download, no parsing)
+
+    Crawl frontier:
+    ---------------
+    Api(.., frontier=Frontier(path)) : every search result (article url) is added to the frontier
+
+    Redirects & retries:
+    --------------------
+    Redirects are followed (up to max_redirects), permanent ones (301 / 308) are remembered
+    (UrlAliases, pass UrlAliases(path) to keep them across runs) : next requests go straight to
+    the new url. Throttling (429 / 503, Retry-After honored), 5xx and network errors are retried
+    (cf. Retry), then FetchError (RateLimited, TooManyRedirects) is raised.
+
+    Metrics:
+    --------
+    Api(.., metrics=Metrics(callback=..)) times every request (queue wait, rate limit sleep, network,
+    redirect) and parse, counts responses by status & endpoint class, bytes and cache hits,
+    cf. metrics.snapshot() / metrics.to_prometheus()
     """
 
     baseUrl = "https://www.lemonde.fr"
     searchUrl = "https://www.lemonde.fr/recherche/?"
+    max_redirects = 5
 
     cookie = "lmd_sso_twipe={lmd_sso_twipe}; lmd_a_s={lmd_s}; lmd_a_sp={lmd_s}; lmd_stay_connected=1; lmd_a_m={lmd_m}; lmd_a_c=1; uid_dm=f8bb6ded-ea6d-42fd-6eb0-ae4eb62eb552; xtvrn=$43260$; xtan43260=-; xtant43260=1; kw.session_ts=1677086760394; kw.pv_session=4"
     headers = {
@@ -68,12 +88,42 @@ class Api:
         "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/74.0.3729.169 Safari/537.36",
     }
 
-    def __init__(self, lmd_m: str = None, lmd_s: str = None):
+    def __init__(
+        self,
+        lmd_m: str = None,
+        lmd_s: str = None,
+        governor: Governor | None = None,
+        max_workers: int = 4,
+        store: HtmlStore | None = None,
+        replay: bool = False,
+        validators: ValidatorIndex | None = None,
+        frontier: Frontier | None = None,
+        metrics: Metrics | None = None,
+        retry: Retry | None = None,
+        aliases: UrlAliases | None = None,
+    ):
         self.lmd_m = lmd_m
         self.lmd_s = lmd_s
-        self._login()
+        self.governor = governor if governor else Governor()
+        self.max_workers = max_workers
+        self.store = store
+        self.replay = replay
+        self.validators = validators
+        self.frontier = frontier
+        self.metrics = metrics
+        self.retry = retry if retry else Retry()
+        self.aliases = aliases if aliases is not None else UrlAliases()
+        self._local = threading.local()
+        if replay:
+            if not store:
+                raise ValueError("replay mode needs a store")
+            self.client = None
+        else:
+            self._login()
 
     def __repr__(self):
+        if self.replay:
+            return f"Replay client ({self.store})"
         return f"Logged-in client ({self.client})"
 
     def __exit__(self):
@@ -89,26 +139,172 @@ class Api:
                 lmd_s=self.lmd_s,
                 lmd_m=self.lmd_m,
             )
-            self.client = httpx.Client(headers=self.headers, timeout=8)
+            self.client = self._client(self.headers)
         else:
             raise ValueError('cookies abonné "lmd_m" et "lmd_s" nécessaires')
 
-    def _fetch(self, url) -> HTMLParser:
-        """Fetch url with httpx client & parse html (selectolax), at once
-        Note : you should apply rate limits/backoff and or caching in your main()
-        TODO: more status_code handling
+    def _client(self, headers: dict) -> httpx.Client:
+        """httpx client used by _fetch, overridden by AsyncApi"""
+        return httpx.Client(headers=headers, timeout=8)
+
+    def _from_store(self, url) -> bytes:
+        """Replay mode : raw content of url, from store"""
+        content = self.store.get(url)
+        self._cache("store", content is not None)
+        if content is None:
+            raise KeyError(f"{url} not in {self.store} (replay mode)")
+        return content
+
+    def _observe(self, timing: Timing):
+        if self.metrics:
+            self.metrics.observe(timing)
+
+    def _cache(self, name: str, hit: bool):
+        if self.metrics:
+            self.metrics.cache(name, hit)
+
+    def _queue_wait(self) -> float:
+        """Time the current task waited for a worker thread (cf. _ordered_map), once"""
+        queued, self._local.queued = getattr(self._local, "queued", 0.0), 0.0
+        return queued
+
+    def _resolve(self, url) -> str:
+        """Url to request for url : its new url if it moved permanently (cf. self.aliases)"""
+        target = self.aliases.resolve(url)
+        self._cache("aliases", target != url)
+        return target
+
+    def _next_hop(
+        self, url, response: httpx.Response, timing: Timing, hops: int
+    ) -> str | None:
+        """Url to follow if response (to url) is a redirect, else None
+        Permanent redirects are remembered, raises TooManyRedirects after max_redirects hops
         """
-        time.sleep(random.uniform(0.6, 0.8))
-        response = self.client.get(url)
-
-        if 300 > response.status_code >= 200:
-            return HTMLParser(response.text)
-        # url redirect (e.g. an updated article -> new url)
-        elif response.status_code == 301:
-            response = self.client.send(response.next_request)
-            return HTMLParser(response.text)
-        else:
-            print(f"Error {response.status_code}.\n{response}")
+        timing.bytes += response.num_bytes_downloaded
+        location = response.headers.get("location")
+        if not response.is_redirect or not location:
+            return None
+        if hops >= self.max_redirects:
+            raise TooManyRedirects(url, response.status_code, f"({hops} redirects)")
+        target = urllib.parse.urljoin(url, location)
+        if response.status_code in (301, 308):
+            self.aliases.add(url, target)
+        return target
+
+    def _received(self, endpoint: Endpoint, response: httpx.Response, timing: Timing):
+        """Final response of an attempt : timing & Governor feedback"""
+        timing.status = response.status_code
+        if response.status_code == 304:
+            timing.cache = "not_modified"
+        self.governor.feedback(
+            endpoint,
+            response.status_code,
+            timing.network,
+            retry_after=retry_after(response.headers),
+        )
+        return response
+
+    def _error(self, url, response: httpx.Response) -> FetchError | None:
+        """Typed error of a final response, None if ok (2xx, 304)"""
+        status = response.status_code
+        if 300 > status >= 200 or status == 304:
+            return None
+        if status in (429, 503):
+            return RateLimited(url, status, retry_after(response.headers))
+        return FetchError(url, status, response.reason_phrase)
+
+    def _retry_delay(self, error: FetchError, attempt: int) -> float:
+        """Delay before next attempt (cf. self.retry), raises error if it's not to be retried"""
+        delay = self.retry.delay(attempt, error)
+        if delay is None:
+            raise error
+        logging.warning(
+            f"{error}, retry {attempt}/{self.retry.tries - 1} in {delay:.1f}s"
+        )
+        return delay
+
+    def _content(
+        self, url, response: httpx.Response, headers: dict | None, remember: bool
+    ) -> bytes:
+        """Content of the final (2xx) response of url, raises NotModified on 304
+        Validators are kept only if the parsed result of url will be committed (cf. _remember)
+        """
+        if headers:
+            self._cache("validators", response.status_code == 304)
+        if response.status_code == 304:
+            raise NotModified(url)
+        if self.validators and remember:
+            self.validators.seen(url, response.headers)
+        if self.store:
+            self.store.put(url, response.content)
+        return response.content
+
+    def _attempt(self, url, endpoint: Endpoint, headers: dict | None, timing: Timing):
+        """Single attempt : rate limit, request url (or its alias), follow redirects"""
+        timing.rate_limit = self.governor.wait(endpoint)
+        target = self._resolve(url)
+        start = time.monotonic()
+        response = self.client.get(target, headers=headers)
+        timing.network = time.monotonic() - start
+
+        hops, start = 0, time.monotonic()
+        while next_url := self._next_hop(target, response, timing, hops):
+            target, hops = next_url, hops + 1
+            response = self.client.get(target, headers=headers)
+        timing.redirect = time.monotonic() - start if hops else 0.0
+        return self._received(endpoint, response, timing)
+
+    def _fetch_raw(
+        self, url, endpoint: Endpoint = Endpoint.ARTICLE, remember: bool = False
+    ) -> bytes:
+        """Fetch url with httpx client, return raw content (bytes)
+        Rate limited by self.governor, given the endpoint class of url
+        Redirects followed, throttling / server / network errors retried (cf. Api docstring)
+        Raw content is kept in self.store if any, read from it in replay mode
+        Raises NotModified on 304 (conditional request, cf. self.validators),
+        FetchError (RateLimited, TooManyRedirects) if url can't be fetched
+        remember : the parsed result of url will be committed (_remember), keep its validators
+        """
+        timing = Timing(endpoint.value, url, queue=self._queue_wait())
+        if self.replay:
+            content = self._from_store(url)
+            timing.cache, timing.bytes = "store", len(content)
+            self._observe(timing)
+            return content
+
+        headers = self.validators.headers(url) if self.validators else None
+        for attempt in itertools.count(1):
+            try:
+                response = self._attempt(url, endpoint, headers, timing)
+                error = self._error(url, response)
+            except httpx.TransportError as e:
+                error = FetchError(url, reason=repr(e))
+                error.__cause__ = e
+            except FetchError as e:
+                error = e
+            self._observe(timing)
+            if not error:
+                return self._content(url, response, headers, remember)
+            delay = self._retry_delay(error, attempt)
+            time.sleep(delay)
+            timing = Timing(endpoint.value, url, retry=delay)
+
+    def _parse(self, endpoint: Endpoint, parser, *args):
+        """parser(*args), parse time recorded by self.metrics, if any"""
+        if not self.metrics:
+            return parser(*args)
+        start = time.monotonic()
+        result = parser(*args)
+        self.metrics.observe(Timing(endpoint.value, parse=time.monotonic() - start))
+        return result
+
+    def _fetch(
+        self, url, endpoint: Endpoint = Endpoint.ARTICLE, remember: bool = False
+    ) -> HTMLParser:
+        """Fetch url & parse html (selectolax), at once"""
+        return self._parse(
+            endpoint, HTMLParser, self._fetch_raw(url, endpoint, remember)
+        )
 
     def _type_url(self, url) -> str:
         """Convenience function to check if an url is article, blog or live"""
@@ -127,7 +323,7 @@ class Api:
         try:
             return html.css_first(selector).text()
         except AttributeError as e:
-            print(f"{e}, (attribute {selector} is missing)")
+            logging.warning(f"{e}, (attribute {selector} is missing)")
             return None
 
     def get_css(self, html, selector) -> str | None:
@@ -137,13 +333,61 @@ class Api:
         try:
             return [node.text() for node in html.css(selector)]
         except AttributeError as e:
-            print(f"{e}, (attribute(s) {selector} are missing)")
+            logging.warning(f"{e}, (attribute(s) {selector} are missing)")
             return None
 
     def _clean(self, string) -> str | None:
         """Util :remove white spaces / special char from content string"""
-        string = unicodedata.normalize("NFKD", string) if string else None
-        return " ".join(string.split()) if string else None
+        return clean(string)
+
+    def _search_url(self, query: str, start: str, end: str, **kwargs) -> str:
+        """Build ./recherche? url from search parameters"""
+        search_parameters = {"search_keywords": query, "start_at": start, "end_at": end}
+        search_parameters["search_sort"] = kwargs.get(
+            "dateCreated_desc", "dateCreated_desc"
+        )
+        return f"{self.searchUrl}{urllib.parse.urlencode(search_parameters)}"
+
+    def _parse_search_probe(self, html) -> tuple[bool, int]:
+        """From first search page : is there any result, and how many pages (river)"""
+        return self._parse(Endpoint.SEARCH, parse_search_probe, html)
+
+    def _parse_search_page(self, html) -> list[dict]:
+        """Parse urls, titles of a search page"""
+        return self._parse(Endpoint.SEARCH, parse_search_page, html)
+
+    def _search_probe(self, query: str, start: str, end: str, **kwargs) -> tuple:
+        """Fetch first search page, return (url, html, n_pages)"""
+        url = self._search_url(query, start, end, **kwargs)
+
+        # get result page
+        html = self._fetch(url, Endpoint.SEARCH)
+        is_result, n_pages = self._parse_search_probe(html)
+        if not is_result:
+            raise NoResult(url)
+        return url, html, n_pages
+
+    def _enqueue(self, results: list[dict]) -> list[dict]:
+        """Feed search results (article urls only, no blog / live) to self.frontier, if any"""
+        if self.frontier:
+            urls = [r["url"] for r in results if self._type_url(r["url"]) == "article"]
+            self.frontier.add(urls, kind="article")
+        return results
+
+    def _iter_search_pages(self, url: str, html, n_pages: int, **kwargs):
+        """Yield results page by page, first page (probe) is reused as page 1"""
+        max_pages = min(kwargs.get("max_pages", n_pages), n_pages)
+        yield self._enqueue(self._parse_search_page(html))
+        for page in range(2, max_pages + 1):
+            html = self._fetch(f"{url}&page={page}", Endpoint.SEARCH)
+            yield self._enqueue(self._parse_search_page(html))
+
+    def iter_search_results(self, query: str, start: str, end: str, **kwargs):
+        """Same args as search(), but a generator : yields each page's results
+        ([{"url":.., "title":..}, ..]) as soon as the page is parsed
+        """
+        url, html, n_pages = self._search_probe(query, start, end, **kwargs)
+        yield from self._iter_search_pages(url, html, n_pages, **kwargs)
 
     def search(self, query: str, start: str, end: str, **kwargs) -> type[Search]:
         """
@@ -157,52 +401,130 @@ class Api:
         search_sort: optional["dateCreated_desc (default)", "dateCreated_asc, relevance_desc"]
         max_pages: optional(int) get max_pages instead of all pages
         """
-        search_parameters = {"search_keywords": query, "start_at": start, "end_at": end}
-        search_parameters["search_sort"] = kwargs.get(
-            "dateCreated_desc", "dateCreated_desc"
-        )
-        max_pages = kwargs.get("max_pages", 1)
-
-        url = f"{Api.searchUrl}{urllib.parse.urlencode(search_parameters)}"
-
-        # get result page
-        html = self._fetch(url)
-        is_result = True if not html.css_first(Css.S_IS_RESULT.value) else False
-
-        # is result?, is several pages ? (river)
-        if is_result:
-            river = True if html.css(Css.S_RIVER.value) else False
-            n_pages = int(html.css(Css.S_PAGES.value)[-1].text()) if river else 1
-            max_pages = (
-                kwargs.get("max_pages", n_pages) if max_pages <= n_pages else n_pages
-            )
-
-            # parse urls, titles
-            page = 1
-            results = []
-            while page <= max_pages:
-                print(f"page:{page}/{max_pages}")
-                html = self._fetch(f"{url}&page={page}")
-                urls = [url.attributes["href"] for url in html.css(Css.S_URL.value)]
-                titles = [title.text() for title in html.css(Css.S_TITLE.value)]
-                result = [
-                    {"url": a_url, "title": a_title}
-                    for a_url, a_title in zip(urls, titles)
-                ]
+        url, html, n_pages = self._search_probe(query, start, end, **kwargs)
 
-                results.extend(result)
-                page += 1
-        else:
-            raise Exception("No Result found")
+        # parse urls, titles
+        results = []
+        for page in self._iter_search_pages(url, html, n_pages, **kwargs):
+            results.extend(page)
         return Search(
             query=query,
             url=url,
-            is_result=is_result,
+            is_result=True,
             pages=n_pages,
             retrieved=len(results) if results else 0,
             results=results,
         )
 
+    def _shards(self, start: str, end: str, days: int) -> list[tuple[str, str]]:
+        """Split [start, end] ("dd/mm/yyyy", inclusive) into shards of "days" days"""
+        start = datetime.strptime(start, "%d/%m/%Y")
+        end = datetime.strptime(end, "%d/%m/%Y")
+        shards = []
+        while start <= end:
+            shard_end = min(start + timedelta(days=days - 1), end)
+            shards.append((start.strftime("%d/%m/%Y"), shard_end.strftime("%d/%m/%Y")))
+            start = shard_end + timedelta(days=1)
+        return shards
+
+    def _range_shards(
+        self, start: str, end: str, shard_days: int, max_shard_pages: int
+    ) -> list[tuple[str, str]]:
+        """Initial shards of search_range(), raises ValueError on invalid shard settings"""
+        if shard_days < 1:
+            raise ValueError(f"shard_days must be >= 1, got {shard_days}")
+        if max_shard_pages < 1:
+            raise ValueError(f"max_shard_pages must be >= 1, got {max_shard_pages}")
+        return self._shards(start, end, shard_days)
+
+    def _split_shard(
+        self, start: str, end: str, n_pages: int, max_shard_pages: int
+    ) -> list[tuple[str, str]] | None:
+        """Split a shard reporting more than max_shard_pages pages in two halves,
+        None if it's small enough or a single day
+        """
+        if n_pages <= max_shard_pages:
+            return None
+        days = (
+            datetime.strptime(end, "%d/%m/%Y") - datetime.strptime(start, "%d/%m/%Y")
+        ).days + 1
+        return self._shards(start, end, (days + 1) // 2) if days > 1 else None
+
+    def _merge_results(
+        self, shards: list[tuple[int, list[dict]]]
+    ) -> tuple[int, list[dict]]:
+        """Merge shards (pages, results) in shards order, deduplicate urls"""
+        pages, results, seen = 0, [], set()
+        for shard_pages, shard_results in shards:
+            pages += shard_pages
+            for result in shard_results:
+                if result["url"] not in seen:
+                    seen.add(result["url"])
+                    results.append(result)
+        return pages, results
+
+    def _range_search(
+        self, query: str, start: str, end: str, searched: list, **kwargs
+    ) -> type[Search]:
+        """Search() of search_range(), from its searched shards (pages, results)"""
+        pages, results = self._merge_results(searched)
+        return Search(
+            query=query,
+            url=self._search_url(query, start, end, **kwargs),
+            is_result=True if results else False,
+            pages=pages,
+            retrieved=len(results),
+            results=results,
+        )
+
+    def _search_shard(
+        self, query: str, start: str, end: str, max_shard_pages: int, **kwargs
+    ) -> tuple[int, list[dict]]:
+        """Search a single shard, split it further if it reports more than max_shard_pages"""
+        try:
+            url, html, n_pages = self._search_probe(query, start, end, **kwargs)
+        except NoResult:
+            return 0, []
+        halves = self._split_shard(start, end, n_pages, max_shard_pages)
+        if halves:
+            return self._merge_results(
+                [
+                    self._search_shard(query, s, e, max_shard_pages, **kwargs)
+                    for s, e in halves
+                ]
+            )
+        results = []
+        for page in self._iter_search_pages(url, html, n_pages, **kwargs):
+            results.extend(page)
+        return n_pages, results
+
+    def search_range(
+        self,
+        query: str,
+        start: str,
+        end: str,
+        shard_days: int = 7,
+        max_shard_pages: int = 50,
+        **kwargs,
+    ) -> type[Search]:
+        """search() over a long period, split into shards of "shard_days" days (weekly by default)
+        Shards reporting more than "max_shard_pages" pages are split further (down to a single day),
+        shards run concurrently (max_workers threads, rate limits still apply),
+        results are merged in shards order, urls deduplicated
+        Same optional kwargs as search(), "max_pages" being per shard
+        """
+        shards = self._range_shards(start, end, shard_days, max_shard_pages)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            searched = list(
+                executor.map(
+                    lambda shard: self._search_shard(
+                        query, *shard, max_shard_pages, **kwargs
+                    ),
+                    shards,
+                )
+            )
+        return self._range_search(query, start, end, searched, **kwargs)
+
     def get_metadata(self, html, filter_by: str | None = None) -> dict:
         """
         Retrieve metadada from article's html
@@ -210,30 +532,13 @@ class Api:
         Optional:
         ---------
         "filter_by" = "your_tag" : check if a given tag in metadata keywords (exact match)
+        Raises MetadataError if metadata can't be extracted
         """
-        html_meta = html.css_first(Css.A_METADATA.value).text()
-        dict_meta = (
-            json.loads(re.search("({.+})", html_meta).group(0)) if html_meta else None
-        )
-        meta = {
-            "article_id": dict_meta["analytics"]["smart_tag"]["customObject"][
-                "ID_Article"
-            ],
-            "date": dict_meta["context"]["article"]["firstPublished"]["date"],
-            "keywords": dict_meta["analytics"]["smart_tag"]["tags"]["keywords"],
-            "article_type": dict_meta["analytics"]["smart_tag"]["customObject"][
-                "Nature_edito"
-            ],
-            "suscribe": dict_meta["analytics"]["smart_tag"]["customObject"][
-                "Statut_article"
-            ],
-        }
-        if filter_by:
-            meta["tags_contain"] = {
-                "tag": filter_by,
-                "is_tag": True if filter_by in meta["keywords"] else False,
-            }
-        return meta
+        return parse_metadata(find_metadata_script(html), filter_by=filter_by)
+
+    def _parse_article(self, url: str, html) -> type[Article]:
+        """Parse an article html into an Article(), single pass (cf. parsers.parse_article_html)"""
+        return self._parse(Endpoint.ARTICLE, parse_article, url, html)
 
     def get_article(self, url: str, **kwargs) -> type[Article]:
         """
@@ -241,72 +546,172 @@ class Api:
         "Live" urls are not fully supported (do not throws error but incomplete content)
         Blog &  Articles "M publicité" not supported
         """
-        html = self._fetch(url)
-        title = self._clean(self.get_css_first(html, selector=Css.A_TITLE.value))
-        desc = self._clean(self.get_css_first(html, selector=Css.A_DESC.value))
-        content = " ".join(
-            [
-                self._clean(node.text())
-                for node in html.css(Css.A_CONTENT.value)
-                if self._clean(node.text()) is not None
-            ]
-        )
-        meta = self.get_metadata(html)
-        allow_comments = self.get_css(html, selector=Css.A_COMS_ALLOWED.value)
-        return Article(
-            url=url,
-            title=title,
-            desc=desc,
-            content=content,
-            article_id=meta["article_id"],
-            date=meta["date"],
-            keywords=meta["keywords"],
-            article_type=meta["article_type"],
-            allow_comments=True if allow_comments else False,
-            premium=True if meta["suscribe"] == "Abo" else False,
-        )
-
-    def get_comments(self, article: type[Article]) -> type[Comments]:
-        """Parse comments, given a previously crawled Article()"""
+        try:
+            html = self._fetch(url, remember=True)
+        except NotModified:
+            return Article(**self.validators.result(url))
+        return self._remember(url, self._parse_article(url, html))
+
+    def _remember(self, url: str, result):
+        """Commit parsed result (Article, Comments) of url along with its validators, if any"""
+        if self.validators:
+            self.validators.commit(url, asdict(result))
+        return result
+
+    def _parse_comments_probe(self, html) -> tuple[int, int] | None:
+        """From first ?contributions page : (count, n_pages), None if no comment"""
+        return self._parse(Endpoint.COMMENTS, parse_comments_probe, html)
+
+    def _parse_comments_page(self, html) -> tuple[list, list, list]:
+        """Parse coms (authors, contents, ids) of a ?contributions page"""
+        return self._parse(Endpoint.COMMENTS, parse_comments_page, html)
+
+    def _get_comments_page(self, url: str, page: int) -> tuple[list, list, list]:
+        """Fetch & parse a single ?contributions page"""
+        html = self._fetch(f"{url}&page={page}", Endpoint.COMMENTS)
+        return self._parse_comments_page(html)
+
+    def _ordered_map(self, executor, fn, items, window: int | None = None):
+        """Like executor.map, but at most "window" (default max_workers) pending futures
+        at once : results are yielded in order as soon as available, memory stays flat
+        """
+        window = window if window else self.max_workers
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(self._queued, fn, item, time.monotonic()))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def _queued(self, fn, item, submitted: float):
+        """Run fn(item) in a worker thread, time spent waiting for it is the request queue wait"""
+        self._local.queued = time.monotonic() - submitted
+        return fn(item)
+
+    def _comments_url(self, article: type[Article]) -> str:
+        """First ?contributions page of article, at its latest known url (cf. self.aliases)
+        so that a moved article doesn't pay the redirect on its comments too
+        """
+        return f"{self.aliases.resolve(article.url)}?contributions"
+
+    def _comments_probe(
+        self, article: type[Article], remember: bool = False
+    ) -> tuple | None:
+        """Fetch first ?contributions page, return (url, html, count, n_pages)
+        None if comments are not allowed or there is no comment
+        remember : all comments will be committed (get_comments), cf. _fetch_raw
+        """
+        if not article.allow_comments:
+            return None
+        url = self._comments_url(article)
+        html = self._fetch(url, Endpoint.COMMENTS, remember)
+        probe = self._parse_comments_probe(html)
+        return (url, html, *probe) if probe else None
+
+    def _iter_comments_pages(self, url: str, html, n_pages: int, first=None):
+        """Yield (authors, contents, ids) page by page, first page (probe) is reused as page 1
+        first : page 1 already parsed, if any (cf. refresh_comments)
+        """
+        yield first if first is not None else self._parse_comments_page(html)
+        if n_pages > 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                yield from self._ordered_map(
+                    executor,
+                    lambda page: self._get_comments_page(url, page),
+                    range(2, n_pages + 1),
+                )
 
-        url = f"{article.url}?contributions"
+    def iter_comments(self, article: type[Article]):
+        """Generator version of get_comments() : yields each page's comments
+        (as a Comments of that page only) in page order, as soon as the page is parsed
+        If not modified since last get_comments(), yields previous comments at once
+        """
+        try:
+            probe = self._comments_probe(article)
+        except NotModified as e:
+            comments = Comments.from_dict(self.validators.result(e.url))
+            if len(comments):
+                yield comments
+            return
+        if probe:
+            url, html, count, n_pages = probe
+            for columns in self._iter_comments_pages(url, html, n_pages):
+                yield Comments(article.article_id, count, *columns)
 
-        if article.allow_comments:
-            html = self._fetch(url)
-            is_comment = (
-                True
-                if self.get_css_first(html, selector=Css.C_IS_COMMENT.value)
-                else False
-            )
-            if is_comment:
-                river = True if html.css(Css.C_RIVER.value) else False
-                count_str = html.css_first(Css.C_COUNT.value).text()
-                count = int("".join(list(filter(str.isdigit, count_str))))
-                n_pages = int(html.css(Css.C_PAGES.value)[-1].text()) if river else 1
-
-                # parse coms authors, contents
-                page = 1
-                all_comments = []
-                while page <= n_pages:
-                    html = self._fetch(f"{url}&page={page}")
-                    authors = [author.text() for author in html.css(Css.C_AUTHOR.value)]
-                    contents = [
-                        self._clean(content.text())
-                        for content in html.css(Css.C_CONTENT.value)
-                    ]
-                    comments = [
-                        {"author": author, "content": content}
-                        for author, content in zip(authors, contents)
-                    ]
-                    all_comments.extend(comments)
-                    page += 1
-
-                return Comments(
-                    article_id=article.article_id,
-                    count=count if is_comment else 0,
-                    comments=all_comments if is_comment else [None],
-                )
-            else:
-                return Comments(article_id=article.article_id, count=0, comments=[None])
+    def get_comments(self, article: type[Article]) -> type[Comments]:
+        """Parse comments, given a previously crawled Article()
+        First ?contributions page (probe) gives count & number of pages and is reused as page 1,
+        remaining pages are fetched by a pool of "max_workers" threads (rate limits still apply),
+        then reassembled in page order
+        """
+        try:
+            probe = self._comments_probe(article, remember=True)
+        except NotModified as e:
+            return Comments.from_dict(self.validators.result(e.url))
+        if probe:
+            url, html, count, n_pages = probe
+
+            # parse coms authors, contents
+            comments = Comments(article_id=article.article_id, count=count)
+            for columns in self._iter_comments_pages(url, html, n_pages):
+                comments.extend(*columns)
+
+            return self._remember(url, comments)
         else:
-            return Comments(article_id=article.article_id, count=0, comments=[None])
+            return self._remember(
+                self._comments_url(article),
+                Comments(article_id=article.article_id, count=0),
+            )
+
+    def _refresh_pages(
+        self, html, previous: type[Comments], count: int, n_pages: int
+    ) -> tuple[tuple, int]:
+        """Page 1 (probe html) parsed, number of first pages that can hold the
+        (count - previous.count) new comments, cf. refresh_comments()
+        """
+        first = self._parse_comments_page(html)
+        per_page = max(len(first[0]), 1)
+        return first, min(n_pages, -(-(count - previous.count) // per_page))
+
+    def _delta(
+        self, comments: type[Comments], previous: type[Comments]
+    ) -> type[Comments]:
+        """Keep the new comments only (newest first), their ids following previous ones"""
+        comments.truncate(comments.count - previous.count)
+        comments.ids = comment_ids(
+            comments.article_id,
+            comments.authors,
+            comments.contents,
+            comments.ids,
+            seen=previous.ordinals(),
+        )
+        return comments
+
+    def refresh_comments(
+        self, article: type[Article], previous: type[Comments]
+    ) -> type[Comments]:
+        """Incremental get_comments() : only fetch & return comments posted since "previous"
+        Comments are listed newest first, so given the new count (probe page) we only fetch
+        the first pages that can contain the (count - previous.count) new comments
+
+        Returns Comments(count=new total count, new comments only), empty if none
+        "previous" : all comments known so far (last get_comments() + later refreshes),
+        ids of the new comments follow them (cf. comment_ids), ready to be upserted
+        """
+        try:
+            probe = self._comments_probe(article)
+        except NotModified:
+            probe = None
+        if not probe:
+            return Comments(article_id=article.article_id, count=previous.count)
+
+        url, html, count, n_pages = probe
+        comments = Comments(article_id=article.article_id, count=count)
+        if count <= previous.count:
+            return comments
+
+        first, pages = self._refresh_pages(html, previous, count, n_pages)
+        for columns in self._iter_comments_pages(url, html, pages, first):
+            comments.extend(*columns)
+        return self._delta(comments, previous)
@@ -0,0 +1,301 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+import urllib.parse
+
+import httpx
+from selectolax.parser import HTMLParser
+
+from .api import Api, Search, Article, Comments
+from .enums import Endpoint
+from .exceptions import FetchError, NotModified, NoResult
+from .metrics import Timing
+
+
+class AsyncApi(Api):
+    """Async flavour of Api, same parsing, same (suscriber) login
+    search(), get_article() and get_comments() are coroutines
+
+    Built on a single httpx.AsyncClient (HTTP/2, keep-alive pool) shared by all calls,
+    so that network latency overlaps across many urls.
+    Concurrency is bounded per host ("max_per_host"), on top of the Governor rate limits
+    (cf. Api docstring).
+
+    Usage:
+    ------
+    Other keyword args (governor, store, replay, validators, frontier, metrics) as in Api
+    (metrics : queue wait is the time spent waiting for the per host semaphore)
+
+    async with AsyncApi(lmd_m=lmd_m, lmd_s=lmd_s, max_per_host=4) as api:
+        articles = await asyncio.gather(*[api.get_article(url) for url in urls])
+    """
+
+    def __init__(
+        self,
+        lmd_m: str = None,
+        lmd_s: str = None,
+        max_per_host: int = 4,
+        max_connections: int = 10,
+        **kwargs,
+    ):
+        self.max_per_host = max_per_host
+        self.max_connections = max_connections
+        self._semaphores = {}
+        super().__init__(lmd_m=lmd_m, lmd_s=lmd_s, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        if self.client:
+            await self.client.aclose()
+
+    def _client(self, headers: dict) -> httpx.AsyncClient:
+        """Shared async client, HTTP/2 + keep-alive connections pool"""
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+        )
+        return httpx.AsyncClient(headers=headers, timeout=8, http2=True, limits=limits)
+
+    def _semaphore(self, url) -> asyncio.Semaphore:
+        """One semaphore per host, bounds the number of in-flight requests"""
+        host = urllib.parse.urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    async def _attempt(
+        self, url, endpoint: Endpoint, headers: dict | None, timing: Timing
+    ):
+        """Single attempt, cf. Api._attempt, in-flight requests bounded per host"""
+        timing.rate_limit = await self.governor.async_wait(endpoint)
+        target = self._resolve(url)
+        queued = time.monotonic()
+        async with self._semaphore(target):
+            start = time.monotonic()
+            timing.queue = start - queued
+            response = await self.client.get(target, headers=headers)
+            timing.network = time.monotonic() - start
+
+            hops, start = 0, time.monotonic()
+            while next_url := self._next_hop(target, response, timing, hops):
+                target, hops = next_url, hops + 1
+                response = await self.client.get(target, headers=headers)
+            timing.redirect = time.monotonic() - start if hops else 0.0
+        return self._received(endpoint, response, timing)
+
+    async def _fetch_raw(
+        self, url, endpoint: Endpoint = Endpoint.ARTICLE, remember: bool = False
+    ) -> bytes:
+        """Fetch url with async httpx client, return raw content (bytes), cf. Api._fetch_raw"""
+        timing = Timing(endpoint.value, url)
+        if self.replay:
+            content = self._from_store(url)
+            timing.cache, timing.bytes = "store", len(content)
+            self._observe(timing)
+            return content
+
+        headers = self.validators.headers(url) if self.validators else None
+        for attempt in itertools.count(1):
+            try:
+                response = await self._attempt(url, endpoint, headers, timing)
+                error = self._error(url, response)
+            except httpx.TransportError as e:
+                error = FetchError(url, reason=repr(e))
+                error.__cause__ = e
+            except FetchError as e:
+                error = e
+            self._observe(timing)
+            if not error:
+                return self._content(url, response, headers, remember)
+            delay = self._retry_delay(error, attempt)
+            await asyncio.sleep(delay)
+            timing = Timing(endpoint.value, url, retry=delay)
+
+    async def _fetch(
+        self, url, endpoint: Endpoint = Endpoint.ARTICLE, remember: bool = False
+    ) -> HTMLParser:
+        """Fetch url & parse html (selectolax), at once"""
+        return self._parse(
+            endpoint, HTMLParser, await self._fetch_raw(url, endpoint, remember)
+        )
+
+    async def _aordered(self, coros):
+        """Run coroutines with at most max_per_host pending tasks, yield results in order"""
+        pending = deque()
+        try:
+            for coro in coros:
+                pending.append(asyncio.ensure_future(coro))
+                if len(pending) >= self.max_per_host:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get_search_page(self, url: str, page: int) -> list[dict]:
+        html = await self._fetch(f"{url}&page={page}", Endpoint.SEARCH)
+        return self._enqueue(self._parse_search_page(html))
+
+    async def _search_probe(self, query: str, start: str, end: str, **kwargs) -> tuple:
+        url = self._search_url(query, start, end, **kwargs)
+        html = await self._fetch(url, Endpoint.SEARCH)
+        is_result, n_pages = self._parse_search_probe(html)
+        if not is_result:
+            raise NoResult(url)
+        return url, html, n_pages
+
+    async def _iter_search_pages(self, url: str, html, n_pages: int, **kwargs):
+        max_pages = min(kwargs.get("max_pages", n_pages), n_pages)
+        yield self._enqueue(self._parse_search_page(html))
+        pages = (self._get_search_page(url, page) for page in range(2, max_pages + 1))
+        async for results in self._aordered(pages):
+            yield results
+
+    async def iter_search_results(self, query: str, start: str, end: str, **kwargs):
+        """Async generator version of search(), yields each page's results in order"""
+        url, html, n_pages = await self._search_probe(query, start, end, **kwargs)
+        async for results in self._iter_search_pages(url, html, n_pages, **kwargs):
+            yield results
+
+    async def search(self, query: str, start: str, end: str, **kwargs) -> type[Search]:
+        """Same args as Api.search(), result pages fetched concurrently"""
+        url, html, n_pages = await self._search_probe(query, start, end, **kwargs)
+        results = []
+        async for page in self._iter_search_pages(url, html, n_pages, **kwargs):
+            results.extend(page)
+        return Search(
+            query=query,
+            url=url,
+            is_result=True,
+            pages=n_pages,
+            retrieved=len(results) if results else 0,
+            results=results,
+        )
+
+    async def _search_shard(
+        self, query: str, start: str, end: str, max_shard_pages: int, **kwargs
+    ) -> tuple[int, list[dict]]:
+        try:
+            url, html, n_pages = await self._search_probe(query, start, end, **kwargs)
+        except NoResult:
+            return 0, []
+        halves = self._split_shard(start, end, n_pages, max_shard_pages)
+        if halves:
+            return self._merge_results(
+                await asyncio.gather(
+                    *[
+                        self._search_shard(query, s, e, max_shard_pages, **kwargs)
+                        for s, e in halves
+                    ]
+                )
+            )
+        results = []
+        async for page in self._iter_search_pages(url, html, n_pages, **kwargs):
+            results.extend(page)
+        return n_pages, results
+
+    async def search_range(
+        self,
+        query: str,
+        start: str,
+        end: str,
+        shard_days: int = 7,
+        max_shard_pages: int = 50,
+        **kwargs,
+    ) -> type[Search]:
+        """Same as Api.search_range(), shards run as concurrent tasks"""
+        shards = self._range_shards(start, end, shard_days, max_shard_pages)
+        searched = await asyncio.gather(
+            *[
+                self._search_shard(query, s, e, max_shard_pages, **kwargs)
+                for s, e in shards
+            ]
+        )
+        return self._range_search(query, start, end, searched, **kwargs)
+
+    async def get_article(self, url: str, **kwargs) -> type[Article]:
+        """Same as Api.get_article()"""
+        try:
+            html = await self._fetch(url, remember=True)
+        except NotModified:
+            return Article(**self.validators.result(url))
+        return self._remember(url, self._parse_article(url, html))
+
+    async def _get_comments_page(self, url: str, page: int) -> tuple[list, list, list]:
+        html = await self._fetch(f"{url}&page={page}", Endpoint.COMMENTS)
+        return self._parse_comments_page(html)
+
+    async def _comments_probe(
+        self, article: type[Article], remember: bool = False
+    ) -> tuple | None:
+        if not article.allow_comments:
+            return None
+        url = self._comments_url(article)
+        html = await self._fetch(url, Endpoint.COMMENTS, remember)
+        probe = self._parse_comments_probe(html)
+        return (url, html, *probe) if probe else None
+
+    async def _iter_comments_pages(self, url: str, html, n_pages: int, first=None):
+        yield first if first is not None else self._parse_comments_page(html)
+        pages = (self._get_comments_page(url, page) for page in range(2, n_pages + 1))
+        async for columns in self._aordered(pages):
+            yield columns
+
+    async def iter_comments(self, article: type[Article]):
+        """Async generator version of get_comments(), yields each page's comments in order"""
+        try:
+            probe = await self._comments_probe(article)
+        except NotModified as e:
+            comments = Comments.from_dict(self.validators.result(e.url))
+            if len(comments):
+                yield comments
+            return
+        if probe:
+            url, html, count, n_pages = probe
+            async for columns in self._iter_comments_pages(url, html, n_pages):
+                yield Comments(article.article_id, count, *columns)
+
+    async def get_comments(self, article: type[Article]) -> type[Comments]:
+        """Same as Api.get_comments(), probe reused as page 1, other pages fetched concurrently"""
+        try:
+            probe = await self._comments_probe(article, remember=True)
+        except NotModified as e:
+            return Comments.from_dict(self.validators.result(e.url))
+        if probe:
+            url, html, count, n_pages = probe
+            comments = Comments(article_id=article.article_id, count=count)
+            async for columns in self._iter_comments_pages(url, html, n_pages):
+                comments.extend(*columns)
+            return self._remember(url, comments)
+        return self._remember(
+            self._comments_url(article),
+            Comments(article_id=article.article_id, count=0),
+        )
+
+    async def refresh_comments(
+        self, article: type[Article], previous: type[Comments]
+    ) -> type[Comments]:
+        """Same as Api.refresh_comments(), only comments posted since "previous" """
+        try:
+            probe = await self._comments_probe(article)
+        except NotModified:
+            probe = None
+        if not probe:
+            return Comments(article_id=article.article_id, count=previous.count)
+
+        url, html, count, n_pages = probe
+        comments = Comments(article_id=article.article_id, count=count)
+        if count <= previous.count:
+            return comments
+
+        first, pages = self._refresh_pages(html, previous, count, n_pages)
+        async for columns in self._iter_comments_pages(url, html, pages, first):
+            comments.extend(*columns)
+        return self._delta(comments, previous)
@@ -1,9 +1,24 @@
 from pathlib import Path
+from itertools import islice
+from typing import Iterable, Iterator
+import argparse
+import ast
 import json
 import logging
+import queue
 import sqlite3
+import threading
+import time
 from sqlite3 import Error
 
+from lmd_ukr.fts import create_fts, has_fts
+from lmd_ukr.models import comment_ids
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO)
 
 
@@ -33,6 +48,129 @@ def create_table(conn, sql_create_table):
         print(e)
 
 
+def tune_for_bulk(conn, cache_mb: int = 64):
+    """Bulk load settings : WAL journal, fsync at checkpoints only (synchronous=NORMAL,
+    safe in WAL mode), bigger page cache, temp b-trees (index builds) in memory
+    """
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA cache_size=-{cache_mb * 1024};")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+
+
+SQL_CREATE_COMMENTS = """CREATE TABLE IF NOT EXISTS {table} (
+        id integer PRIMARY KEY, -- stable rowid, cf. fts.py
+        article_id integer,
+        comment_id text,
+        author text,
+        comment text,
+        FOREIGN KEY (article_id) REFERENCES articles (article_id)
+        );"""
+
+
+def migrate_comments(conn):
+    """Add comments.comment_id (older dbs) and its unique index, needed by upserts
+    Older dbs :
+    - comments without an "id" integer primary key are copied to a new table (rowids kept),
+      the comments FTS table, if any, is dropped (rebuilt by create_fts)
+    - drop the ('None', 'None') placeholder rows of articles without comments
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(comments)")]
+    with conn:
+        if "comment_id" not in columns:
+            conn.execute("ALTER TABLE comments ADD COLUMN comment_id text;")
+        if "id" not in columns:
+            conn.execute(SQL_CREATE_COMMENTS.format(table="comments_migrated"))
+            conn.execute("""INSERT INTO comments_migrated
+                (id, article_id, comment_id, author, comment)
+                SELECT rowid, article_id, comment_id, author, comment FROM comments;""")
+            conn.execute("DROP TABLE comments;")  # along with its indexes & triggers
+            conn.execute("ALTER TABLE comments_migrated RENAME TO comments;")
+            conn.execute("DROP TABLE IF EXISTS comments_fts;")
+        conn.execute("""DELETE FROM comments WHERE comment_id IS NULL
+            AND author = 'None' AND comment = 'None';""")
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_comments_comment_id "
+            "ON comments (comment_id);"
+        )
+
+
+# keywords of an article row, if its keywords column is a json array
+_KEYWORDS_OF = """SELECT {row}.article_id, value
+    FROM {tables}json_each({row}.keywords)
+    WHERE CASE WHEN json_valid({row}.keywords)
+    THEN json_type({row}.keywords) END = 'array'"""
+
+
+def create_keywords(conn):
+    """Keywords, one row per (keyword, article_id), e.g. tag filtering as an indexed lookup
+    articles.keywords (json array) remains the source, triggers keep article_keywords in sync
+    Older dbs : keywords stored as str(list) are converted to json first
+    """
+    with conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS article_keywords (
+            article_id integer,
+            keyword text,
+            PRIMARY KEY (keyword, article_id)
+            ) WITHOUT ROWID;""")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_article_keywords_article_id "
+            "ON article_keywords (article_id);"
+        )
+        keywords_of_new = _KEYWORDS_OF.format(row="new", tables="")
+        insert = f"INSERT OR IGNORE INTO article_keywords {keywords_of_new};"
+        delete = "DELETE FROM article_keywords WHERE article_id = old.article_id;"
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS article_keywords_ai AFTER INSERT ON articles "
+            f"BEGIN {insert} END;"
+        )
+        conn.execute(
+            "CREATE TRIGGER IF NOT EXISTS article_keywords_ad AFTER DELETE ON articles "
+            f"BEGIN {delete} END;"
+        )
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS article_keywords_au
+            AFTER UPDATE OF keywords ON articles
+            BEGIN {delete} {insert} END;""")
+        legacy = conn.execute(
+            "SELECT article_id, keywords FROM articles WHERE NOT json_valid(keywords)"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE articles SET keywords = ? WHERE article_id = ?",
+            [
+                (json.dumps(ast.literal_eval(keywords), ensure_ascii=False), article_id)
+                for article_id, keywords in legacy
+            ],
+        )
+        keywords_of_rows = _KEYWORDS_OF.format(row="articles", tables="articles, ")
+        conn.execute(f"INSERT OR IGNORE INTO article_keywords {keywords_of_rows};")
+
+
+def articles_with_keyword(conn, keyword: str) -> list[int]:
+    """article_id of articles tagged with keyword (e.g. "Guerre en Ukraine"), indexed lookup"""
+    sql = "SELECT article_id FROM article_keywords WHERE keyword = ?"
+    return [row[0] for row in conn.execute(sql, (keyword,))]
+
+
+def drop_legacy_comments(conn) -> int:
+    """Rows loaded before comment ids (comment_id NULL) of articles since reloaded with ids"""
+    with conn:
+        cur = conn.execute(
+            """DELETE FROM comments WHERE comment_id IS NULL AND article_id IN (
+            SELECT article_id FROM comments WHERE comment_id IS NOT NULL)"""
+        )
+    return cur.rowcount
+
+
+def create_indexes(conn):
+    """Secondary indexes, built once after the load (cheaper than updating them per insert)"""
+    with conn:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_comments_article_id "
+            "ON comments (article_id);"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date);")
+
+
 """
 2. Format (json -> object already) files to be fed into db
 """
@@ -43,11 +181,11 @@ def parse_article(article: dict) -> tuple:
     return (
         article["article_id"],
         article["url"],
-        article["desc"],
         article["title"],
+        article["desc"],
         article["content"],
         article["date"],
-        str(article["keywords"]),
+        json.dumps(article["keywords"], ensure_ascii=False),
         article["article_type"],
         article["allow_comments"],
         article["premium"],
@@ -57,31 +195,113 @@ def parse_article(article: dict) -> tuple:
 def parse_comments(comments: dict) -> list[tuple]:
     """Convert / parse dict comments into [n*(flattened comments values)]
     we will iterate before inserting into db
+    Comments files are column-wise ("authors", "contents", "ids"), older ones row-wise ("comments")
     """
-    list_comms = []
+    article_id = comments["article_id"]
     if comments["count"] > 0:
-        for comm in comments["comments"]:
-            list_comms.append(
-                (
-                    comments["article_id"],
-                    comm["author"],
-                    comm["content"],
-                )
-            )
-        return list_comms
+        if "comments" in comments:
+            rows = [comm for comm in comments["comments"] if comm]
+            authors = [comm["author"] for comm in rows]
+            contents = [comm["content"] for comm in rows]
+        else:
+            authors, contents = comments["authors"], comments["contents"]
+        ids = comment_ids(article_id, authors, contents, comments.get("ids"))
+        return list(zip([article_id] * len(ids), ids, authors, contents))
     else:
-        return [(comments["article_id"], "None", "None")]
+        return []
+
+
+def load_json(file: Path) -> dict:
+    """Decode a json file, orjson if installed"""
+    if orjson:
+        return orjson.loads(Path(file).read_bytes())
+    with open(file, "r") as f:
+        return json.load(f)
+
+
+def read_json(files: Iterable[Path]) -> Iterator[dict]:
+    """Stream json files, one dict at a time"""
+    for file in files:
+        yield load_json(file)
+
+
+def read_json_parallel(
+    files: Iterable[Path], workers: int = 4, queue_size: int = 256
+) -> Iterator[dict]:
+    """Stream json files decoded by a pool of reader threads, through a bounded queue
+    (files order is not kept). The consumer, i.e. the single sqlite writer, inserts
+    while next files are being read & decoded. Readers stop if the consumer does.
+    """
+    files = list(files)
+    workers = max(1, min(workers, len(files)))
+    decoded = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                decoded.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def reader(chunk: list[Path]):
+        try:
+            for file in chunk:
+                if stop.is_set():
+                    return
+                put(load_json(file))
+        except Exception as e:
+            put(e)
+        finally:
+            put(finished)
+
+    threads = [
+        threading.Thread(target=reader, args=(files[i::workers],), daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        running = workers
+        while running:
+            item = decoded.get()
+            if item is finished:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def article_rows(articles: Iterable[dict]) -> Iterator[tuple]:
+    for article in articles:
+        row = parse_article(article)
+        logging.debug(f"inserting article, id: {row[0]}")
+        yield row
+
+
+def comment_rows(comments: Iterable[dict]) -> Iterator[tuple]:
+    for comments_dict in comments:
+        rows = parse_comments(comments_dict)
+        logging.debug(
+            f"inserting batch of {len(rows)} comments "
+            f"from article {comments_dict['article_id']}"
+        )
+        yield from rows
 
 
 """
 3.  Populate sqlite db, article by article, bactch-wise for comments (faster)
+    or bulk_load() everything, chunk by chunk (fastest)
 """
 
-
-def create_article(conn, article: tuple):
-    """Insert properly formatted article into db, row by row"""
-
-    sql = """INSERT OR IGNORE INTO articles (
+SQL_INSERT_ARTICLE = """INSERT INTO articles (
         article_id,
         url,
         title,
@@ -92,9 +312,40 @@ def create_article(conn, article: tuple):
         article_type,
         allow_comments,
         premium
-        ) VALUES(?,?,?,?,?,?,?,?,?,?)"""
+        ) VALUES(?,?,?,?,?,?,?,?,?,?)
+        ON CONFLICT (article_id) DO UPDATE SET
+        url = excluded.url,
+        title = excluded.title,
+        desc = excluded.desc,
+        content = excluded.content,
+        date = excluded.date,
+        keywords = excluded.keywords,
+        article_type = excluded.article_type,
+        allow_comments = excluded.allow_comments,
+        premium = excluded.premium
+        WHERE (url, title, desc, content, date, keywords, article_type,
+        allow_comments, premium)
+        IS NOT (excluded.url, excluded.title, excluded.desc, excluded.content,
+        excluded.date, excluded.keywords, excluded.article_type,
+        excluded.allow_comments, excluded.premium)"""
+
+SQL_INSERT_COMMENT = """INSERT INTO comments (
+        article_id,
+        comment_id,
+        author,
+        comment
+        ) VALUES(?,?,?,?)
+        ON CONFLICT (comment_id) DO UPDATE SET
+        author = excluded.author,
+        comment = excluded.comment
+        WHERE (author, comment) IS NOT (excluded.author, excluded.comment)"""
+
+
+def create_article(conn, article: tuple):
+    """Insert properly formatted article into db, row by row"""
+
     cur = conn.cursor()
-    cur.execute(sql, article)
+    cur.execute(SQL_INSERT_ARTICLE, article)
     conn.commit()
     return cur.lastrowid
 
@@ -106,18 +357,62 @@ def create_batch_comments(conn, list_comments: list[tuple]) -> None:
     """
 
     cur = conn.cursor()
-    sql = """INSERT OR IGNORE INTO comments (
-        article_id,
-        author,
-        comment
-        ) VALUES(?,?,?)"""
-    cur.executemany(sql, list_comments)
+    cur.executemany(SQL_INSERT_COMMENT, list_comments)
     conn.commit()
 
 
+def bulk_insert(conn, sql: str, rows: Iterable[tuple], chunk_size: int = 50_000) -> int:
+    """executemany() over a stream of rows, one transaction per chunk, return rows count"""
+    rows = iter(rows)
+    total = 0
+    while chunk := list(islice(rows, chunk_size)):
+        with conn:
+            conn.executemany(sql, chunk)
+        total += len(chunk)
+        logging.info(f"{total} rows inserted")
+    return total
+
+
+def bulk_load(
+    conn,
+    articles: Iterable[dict],
+    comments: Iterable[dict],
+    chunk_size: int = 50_000,
+    fts: bool = False,
+) -> tuple[int, int]:
+    """Load (upsert) decoded articles & comments (dicts, e.g. read_json_parallel(files)) in chunks,
+    then build secondary indexes. Return (n articles rows, n comments rows)
+    Idempotent : comments are unique on comment_id (unique index built first, upserts need it)
+    fts : also build full text search tables (cf. lmd_ukr.fts), kept in sync by triggers after that
+    """
+    tune_for_bulk(conn)
+    migrate_comments(conn)
+    create_keywords(conn)
+    n_articles = bulk_insert(
+        conn, SQL_INSERT_ARTICLE, article_rows(articles), chunk_size
+    )
+    n_comments = bulk_insert(
+        conn, SQL_INSERT_COMMENT, comment_rows(comments), chunk_size
+    )
+    dropped = drop_legacy_comments(conn)
+    if dropped:
+        logging.info(f"{dropped} legacy comments rows (no comment_id) replaced")
+    create_indexes(conn)
+    if fts or has_fts(conn):
+        # first time : index all rows at once, afterwards triggers did the job
+        # (a comments_fts dropped by migrate_comments is rebuilt)
+        create_fts(conn, rebuild=False)
+    return n_articles, n_comments
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Build sqlite dataset from json files")
+    parser.add_argument("--db", default="ukr.db")
+    parser.add_argument("--fts", action="store_true", help="full text search tables")
+    args = parser.parse_args()
+
     # sqlite db name
-    database = r"ukr.db"
+    database = args.db
 
     # load json articles and comments (locally)
     # We saved them continuously/individually while crawling
@@ -139,18 +434,13 @@ def main():
         desc text,
         content text,
         date text,
-        keywords text,
+        keywords text, -- json array, cf. article_keywords
         article_type text,
         allow_comments text,
         premium text
         );"""
 
-    sql_create_comments_table = """CREATE TABLE IF NOT EXISTS comments (
-        article_id integer,
-        author text,
-        comment text,
-        FOREIGN KEY (article_id) REFERENCES articles (article_id)
-        );"""
+    sql_create_comments_table = SQL_CREATE_COMMENTS.format(table="comments")
 
     # create db, create tables articles & comments
     conn = create_connection(database)
@@ -159,25 +449,18 @@ def main():
         create_table(conn, sql_create_articles_table)
         create_table(conn, sql_create_comments_table)
 
-        # insert articles into according table
-        for index, file in enumerate(articles_json):
-            with open(file, "r") as f:
-                article_dict = json.load(f)
-                article = parse_article(article_dict)
-                logging.info(
-                    f"inserting article, id: {article[0]} {index}/{len(articles_json)}"
-                )
-                create_article(conn, article)
-
-        # insert comments (batch per batch) into according table
-        for index, file in enumerate(comments_json):
-            with open(file, "r") as f:
-                comments_dict = json.load(f)
-                list_comments = parse_comments(comments_dict)
-                create_batch_comments(conn, list_comments)
-                logging.info(
-                    f"inserting batch of {len(list_comments)} comments from article {index}/{len(comments_json)}"
-                )
+    # insert articles, then comments (chunk per chunk) into according tables
+    start = time.perf_counter()
+    n_articles, n_comments = bulk_load(
+        conn,
+        read_json_parallel(articles_json),
+        read_json_parallel(comments_json),
+        fts=args.fts,
+    )
+    seconds = time.perf_counter() - start
+    logging.info(
+        f"{n_articles} articles, {n_comments} comments loaded in {seconds:.1f}s"
+    )
     conn.close()
 
 
@@ -12,7 +12,7 @@ class Css(Enum):
     # article html selectors
     A_TITLE = "h1.article__title"
     A_DESC = "p.article__desc"
-    A_METADATA = "script"
+    A_METADATA = "script:not([src])"
     A_CONTENT = "p.article__paragraph "
     A_COMS_ALLOWED = "a.comments__active"
     A_COMS_DISABLED = "p.comments__blocked-btn"
@@ -22,5 +22,22 @@ class Css(Enum):
     C_COUNT = "h3.comments__title"
     C_RIVER = "ul.pagination__list"
     C_PAGES = "a.pagination__link"
+    C_COMMENT = "section.comment"
     C_AUTHOR = "span.comment__author"
     C_CONTENT = "p.comment__content"
+
+
+class Endpoint(Enum):
+    # endpoint classes, each one rate limited on its own (cf. Governor)
+    SEARCH = "search"
+    ARTICLE = "article"
+    COMMENTS = "comments"
+
+
+class State(Enum):
+    # crawl frontier, url states (cf. Frontier)
+    PENDING = "pending"
+    IN_FLIGHT = "in_flight"
+    DONE = "done"
+    FAILED = "failed"
+    RETRY = "retry"
@@ -4,35 +4,41 @@ from dotenv import load_dotenv
 import logging
 from dataclasses import asdict
 import json
-import time
-import random
 
 from joblib import Memory
 from functools import lru_cache
-from pyrate_limiter import Duration, Limiter, RequestRate
-import httpx
-import backoff
 
 from lmd_ukr import Api
+from lmd_ukr.governor import Governor
+from lmd_ukr.frontier import Frontier
+from lmd_ukr.aliases import UrlAliases
+from lmd_ukr.metrics import Metrics
 
 logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO)
 
 """
-Rate limiting, caching & backoff policies
+Rate limiting, caching & retry policies
 """
 
-# Rate limits cf. doc pyrate limiter
-rate_limits = (
-    RequestRate(25, Duration.MINUTE),  # 25 requests per minute
-    RequestRate(1200, Duration.HOUR),  # 1200 requests per hour
-)
-limiter = Limiter(*rate_limits)
+# Rate limits (requests/mn per endpoint class), cf. Governor
+# Redirects & retries (429 / 5xx / network errors) are handled by Api, cf. Retry
+governor = Governor(search=25, article=25, comments=25)
+
+
+# Requests timings, status codes, bytes, cache hits (logged after each batch)
+metrics = Metrics()
 
 
 # Disk caching
 cache_location = "./data/cache"
 memory = Memory(cache_location, verbose=0)
 
+# Crawl frontier (urls to crawl, state), shared with get_comments.py
+frontier = Frontier("data/frontier.db", worker="get_articles")
+
+# Moved articles (301 / 308), kept across runs : re-crawls skip the redirect
+aliases = UrlAliases("data/aliases.db")
+
 # Load suscriber's credentials
 load_dotenv()
 lmd_m, lmd_s = (
@@ -46,14 +52,18 @@ def unique_api():
     """Cache trick to ensure we only have one, unique, httpx client instance, for caching.
     Cached fetch (api.get_article, function being outside ou main() should be enough, though.
     """
-    return Api(lmd_m=lmd_m, lmd_s=lmd_s)
+    return Api(
+        lmd_m=lmd_m,
+        lmd_s=lmd_s,
+        governor=governor,
+        frontier=frontier,
+        metrics=metrics,
+        aliases=aliases,
+    )
 
 
 @memory.cache
-@backoff.on_exception(backoff.expo, httpx.HTTPError, max_time=10, max_tries=3)
-@limiter.ratelimit("article", delay=True)
 def cached_get_article(api, url):
-    time.sleep(random.uniform(0.4, 0.6))
     res = api.get_article(url)
     return res
 
@@ -63,15 +73,17 @@ Get Articles
 """
 
 
-def main(tag: str, start: int, end: int):
+def main(tag: str, batch: int = 10):
     """
-    Fetch articles from urls[index_start:index_end]
-    Save to disk as json, if given "tag" in article.keywords
+    Crawl pending article urls of the frontier, until there is none left
+    Save to disk as json, if given "tag" in article.keywords, and queue its comments
+    Can be stopped / restarted at any time, frontier keeps track of what's done
     """
 
     def load_search_results():
         """load search results (json files), return urls
         Use case here : Search results previously saved as json file
+        Note : Api(frontier=frontier).search() feeds the frontier directly
         """
         parent_path = Path("data/results_ukraine")
         filenames = [
@@ -87,34 +99,38 @@ def main(tag: str, start: int, end: int):
             all_urls.extend(urls)
         return all_urls
 
-    def to_filename(start, end, idx):
-        """path + start/end indexes to filename"""
-        return f"data/article_batch_{start}_to_{end}_url_idx_{idx}.json"
-
-    urls = load_search_results()
-    logging.info(f"loaded {len(urls)} urls")
+    def to_filename(article_id):
+        """path + article id to filename"""
+        return f"data/articles_ukraine/article_{article_id}.json"
 
-    # (optional) make sure unique API instance (httpx client) is created, for caching
+    # blog urls not supported
     api = unique_api()
-    logging.info(f"api: {api}, api: {api}")
+    urls = [url for url in load_search_results() if api._type_url(url) == "article"]
+    logging.info(f"loaded {len(urls)} urls, {frontier.add(urls)} new in frontier")
+    logging.info(f"api: {api}, frontier: {frontier}")
 
     # Gather Articles content (batch of x articles), save to disk
-    for idx, url in enumerate(urls[start:end]):
-        logging.info(f" call: {idx}, url: {url}")
-        # blog urls not supported
-        if api._type_url(url) == "article":
-            article = cached_get_article(api, url)
+    Path("data/articles_ukraine").mkdir(parents=True, exist_ok=True)
+    while claimed := frontier.claim("article", n=batch):
+        for url, _ in claimed:
+            logging.debug(f" url: {url}")
+            try:
+                article = cached_get_article(api, url)
+            except Exception as e:
+                frontier.fail(url, "article", error=repr(e), retry_in=600)
+                continue
 
             # check if Article keywords contains "ukraine"
-            filename = to_filename(start, end, idx)
             if tag in article.keywords:
                 # save to disk as json
-                with open(filename, "w") as outfile:
+                with open(to_filename(article.article_id), "w") as outfile:
                     json.dump(asdict(article), outfile)
+                if article.allow_comments:
+                    frontier.add([url], kind="comments", payload=asdict(article))
+            frontier.done(url, "article")
+        logging.info(f"frontier: {frontier}, {metrics}")
 
 
 if __name__ == "__main__":
     tag = "ukraine"
-    start = 0
-    end = 200
-    main(tag, start, end)
+    main(tag)
@@ -4,36 +4,42 @@ from dotenv import load_dotenv
 import logging
 from dataclasses import asdict
 import json
-import time
-import random
 
 from joblib import Memory
 from functools import lru_cache
-from pyrate_limiter import Duration, Limiter, RequestRate
-import httpx
-import backoff
 
 from lmd_ukr import Api
+from lmd_ukr.governor import Governor
+from lmd_ukr.frontier import Frontier
+from lmd_ukr.aliases import UrlAliases
+from lmd_ukr.metrics import Metrics
 from lmd_ukr.api import Article
 
 logging.basicConfig(format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO)
 
 """
-Rate limiting, caching & backoff policies
+Rate limiting, caching & retry policies
 """
 
-# Rate limits cf. doc pyrate limiter
-rate_limits = (
-    RequestRate(25, Duration.MINUTE),  # 20 requests per minute
-    RequestRate(1000, Duration.HOUR),  # 1000 requests per hour
-)
-limiter = Limiter(*rate_limits)
+# Rate limits (requests/mn per endpoint class), cf. Governor
+# Redirects & retries (429 / 5xx / network errors) are handled by Api, cf. Retry
+governor = Governor(search=25, article=25, comments=25)
+
+
+# Requests timings, status codes, bytes, cache hits (logged after each batch)
+metrics = Metrics()
 
 
 # Disk caching
 cache_location = "./data/cache"
 memory = Memory(cache_location, verbose=0)
 
+# Crawl frontier, comments jobs are queued by get_articles.py
+frontier = Frontier("data/frontier.db", worker="get_comments")
+
+# Moved articles (301 / 308), shared with get_articles.py : comments skip the redirect
+aliases = UrlAliases("data/aliases.db")
+
 # Load suscriber's credentials
 load_dotenv()
 lmd_m, lmd_s = (
@@ -47,14 +53,13 @@ def unique_api():
     """Cache trick to ensure we only have one, unique, httpx client instance, for caching.
     Cached fetch (api.get_comments, function being outside ou main() should ne enough, though.
     """
-    return Api(lmd_m=lmd_m, lmd_s=lmd_s)
+    return Api(
+        lmd_m=lmd_m, lmd_s=lmd_s, governor=governor, metrics=metrics, aliases=aliases
+    )
 
 
 @memory.cache
-@backoff.on_exception(backoff.expo, httpx.HTTPError, max_time=10, max_tries=3)
-@limiter.ratelimit("article", delay=True)
 def cached_get_comments(api, article):
-    time.sleep(random.uniform(0.4, 0.6))
     res = api.get_comments(article)
     return res
 
@@ -64,49 +69,37 @@ Get Comments
 """
 
 
-def main(start: int, end: int):
-    """Read previously fetched Articles (json) and get associated comments
-    Continuous save to disk as json
+def main(batch: int = 10):
+    """Crawl pending comments jobs of the frontier (previously fetched Articles)
+    Continuous save to disk as json, can be stopped / restarted at any time
     """
 
-    def load_articles():
-        """load articles (json files), return as list of objects Articles()"""
-        parent_path = Path("data/articles_ukraine")
-        filenames = [
-            file.name
-            for file in parent_path.iterdir()
-            if file.name.startswith("article")
-        ]
-        all_articles = []
-        for file in filenames:
-            f = open(f"data/articles_ukraine/{file}")
-            data = json.load(f)
-            object = Article(**data)
-            all_articles.append(object)
-        return all_articles
-
-    def to_filename(start, end, idx):
-        """path + start/end indexes to filename"""
-        return f"data/comments_batch_{start}_to_{end}_url_idx_{idx}.json"
-
-    articles = load_articles()
-    logging.info(f"loaded {len(articles)} articles")
+    def to_filename(article_id):
+        """path + article id to filename"""
+        return f"data/comments_ukraine/comments_{article_id}.json"
 
     # (optional) make sure unique API instance (httpx client) is created, for caching
     api = unique_api()
+    logging.info(f"frontier: {frontier}")
 
     # Gather Comments, save to disk
-    for idx, article in enumerate(articles[start:end]):
-        logging.info(f" call: {idx}, url: {article.url}")
-        comments = cached_get_comments(api, article)
-        logging.info(f" {comments.count} comments collected")
-
-        filename = to_filename(start, end, idx)
-        with open(filename, "w") as outfile:
-            json.dump(asdict(comments), outfile)
+    Path("data/comments_ukraine").mkdir(parents=True, exist_ok=True)
+    while claimed := frontier.claim("comments", n=batch):
+        for url, payload in claimed:
+            logging.debug(f" url: {url}")
+            article = Article(**payload)
+            try:
+                comments = cached_get_comments(api, article)
+            except Exception as e:
+                frontier.fail(url, "comments", error=repr(e), retry_in=600)
+                continue
+            logging.debug(f" {comments.count} comments collected")
+
+            with open(to_filename(article.article_id), "w") as outfile:
+                json.dump(asdict(comments), outfile)
+            frontier.done(url, "comments")
+        logging.info(f"frontier: {frontier}, {metrics}")
 
 
 if __name__ == "__main__":
-    start = 3000
-    end = 3120
-    main(start, end)
+    main()
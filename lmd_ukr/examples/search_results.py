@@ -4,8 +4,6 @@ import logging
 from dataclasses import asdict
 from datetime import datetime
 import json
-import time
-import random
 
 from lmd_ukr import Api
 
@@ -29,7 +27,8 @@ def main(query, start, end):
     api = Api(lmd_m=lmd_m, lmd_s=lmd_s)
     logging.info(f"api: {api}")
 
-    search = api.search(query=query, start=start, end=end)
+    # weekly shards, run concurrently, merged & deduplicated
+    search = api.search_range(query=query, start=start, end=end, shard_days=7)
     logging.info(f"number of pages: {search.pages}, retrieved {search.retrieved} urls")
     filename = to_filename(query, start, end)
 
@@ -0,0 +1,53 @@
+class NotModified(Exception):
+    """Server answered 304 to a conditional request : previously parsed result is still valid"""
+
+    def __init__(self, url: str):
+        super().__init__(f"{url} not modified")
+        self.url = url
+
+
+class NoResult(Exception):
+    """Search returned no result"""
+
+    def __init__(self, url: str):
+        super().__init__("No Result found")
+        self.url = url
+
+
+class MetadataError(ValueError):
+    """Article metadata could not be extracted : no metadata script, bad json or missing field"""
+
+    def __init__(self, reason: str, field: str | None = None, url: str | None = None):
+        super().__init__(reason if not field else f"{field}: {reason}")
+        self.reason = reason
+        self.field = field
+        self.url = url
+
+
+class FetchError(Exception):
+    """Url could not be fetched : http error status (status) or network error (status is None),
+    raised once retries are exhausted (cf. Retry), or at once if not worth retrying (e.g. 404)
+    """
+
+    def __init__(self, url: str, status: int | None = None, reason: str | None = None):
+        message = f"{url}: {status if status else 'network error'}"
+        super().__init__(f"{message} {reason}" if reason else message)
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+
+class RateLimited(FetchError):
+    """Server throttled us (429 / 503), retry_after : delay (s) it asked for, if any"""
+
+    def __init__(self, url: str, status: int, retry_after: float | None = None):
+        super().__init__(
+            url,
+            status,
+            f"(retry after {retry_after:.0f}s)" if retry_after is not None else None,
+        )
+        self.retry_after = retry_after
+
+
+class TooManyRedirects(FetchError):
+    """Redirect chain longer than Api.max_redirects (or a redirect loop)"""
@@ -0,0 +1,458 @@
+"""
+Parquet export of the sqlite dataset (cf. build_sqlite_dataset), what build_parquet_dataset.ipynb
+does, as a module :
+- articles are cleaned with vectorised polars expressions on a LazyFrame (no row by row .apply)
+- comments are streamed from sqlite batch by batch, each batch is joined with the (small)
+  articles frame and appended to the parquet file (pyarrow ParquetWriter) : the joined
+  articles x comments dataset is never held in memory
+
+Or, export_dataset() : same rows as a hive-style dataset, partitioned by article month
+(month=2022-03/part-0.parquet, zstd), re-run it to only rewrite changed / new partitions
+(fingerprints in _manifest.json), read it back with scan_dataset()
+
+Or, export_tables() : normalised, articles.parquet & comments.parquet (linked by article_id),
+no article column repeated per comment, scan_joined() gives the joined view, lazily.
+In joined (denormalised) outputs, repeated article text columns are categorical (dictionary)
+
+Usage:
+------
+python -m lmd_ukr.export_parquet --db ukr.db --out lmd_ukraine.parquet
+or, installed : lmd-ukr-export --db ukr.db --out lmd_ukraine.parquet
+partitioned : lmd-ukr-export --db ukr.db --out lmd_ukraine --partitioned
+normalised : lmd-ukr-export --db ukr.db --out lmd_ukraine_tables --tables
+
+week = scan_dataset("lmd_ukraine", start=date(2022, 3, 1), end=date(2022, 3, 7)).collect()
+"""
+
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator
+import argparse
+import hashlib
+import json
+import logging
+import os
+import resource
+import shutil
+import sqlite3
+import sys
+import time
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# sqlite columns, as stored by build_sqlite_dataset
+ARTICLES_SCHEMA = pa.schema(
+    [
+        ("article_id", pa.int64()),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("desc", pa.string()),
+        ("content", pa.string()),
+        ("date", pa.string()),
+        ("keywords", pa.string()),
+        ("article_type", pa.string()),
+        ("allow_comments", pa.string()),
+        ("premium", pa.string()),
+    ]
+)
+COMMENTS_SCHEMA = pa.schema(
+    [
+        ("article_id", pa.int64()),
+        ("comment_id", pa.string()),
+        ("author", pa.string()),
+        ("comment", pa.string()),
+    ]
+)
+
+# start of the conflict, older articles got through the search
+START = date(2022, 2, 24)
+# premium articles content is cut, to --kind of, respect copyright
+PREMIUM_CHARS = 2500
+# article columns repeated once per comment in joined outputs
+REPEATED = ("url", "title", "desc", "content")
+
+
+def read_batches(
+    conn, table: str, schema: pa.Schema, batch_size: int = 20_000
+) -> Iterator[pa.RecordBatch]:
+    """Stream a sqlite table as arrow record batches of (at most) batch_size rows"""
+    cur = conn.execute(f"SELECT {', '.join(schema.names)} FROM {table}")
+    while rows := cur.fetchmany(batch_size):
+        columns = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=f.type) for column, f in zip(columns, schema)],
+            schema=schema,
+        )
+
+
+def clean_articles(
+    articles: pl.LazyFrame,
+    start: date | None = START,
+    premium_chars: int = PREMIUM_CHARS,
+) -> pl.LazyFrame:
+    """Vectorised cleaning of raw (sqlite) articles :
+    "1"/"0" -> bool, json keywords -> List[str], date text -> Date, article_type -> Categorical,
+    drop rows with nulls (lives), drop articles before "start", truncate premium content
+    """
+    articles = articles.with_columns(
+        pl.col("allow_comments", "premium")
+        .cast(pl.Int8, strict=False)
+        .cast(pl.Boolean),
+        pl.col("keywords").str.json_decode(pl.List(pl.String)),
+        pl.col("date")
+        .str.slice(0, 19)
+        .str.strptime(pl.Datetime, "%Y-%m-%d %H:%M:%S", strict=False)
+        .dt.date(),
+        pl.col("article_type").cast(pl.Categorical),
+    ).drop_nulls()
+    if start:
+        articles = articles.filter(pl.col("date") >= start)
+    return articles.with_columns(
+        pl.when(pl.col("premium"))
+        .then(pl.col("content").str.slice(0, premium_chars))
+        .otherwise(pl.col("content"))
+        .alias("content")
+    )
+
+
+def load_articles(conn, **kwargs) -> pl.DataFrame:
+    """Cleaned articles (kwargs, cf. clean_articles())"""
+    raw = pa.Table.from_batches(
+        read_batches(conn, "articles", ARTICLES_SCHEMA), ARTICLES_SCHEMA
+    )
+    return clean_articles(pl.from_arrow(raw).lazy(), **kwargs).collect()
+
+
+def _categorical(articles: pl.DataFrame) -> pl.DataFrame:
+    """Repeated (once per comment) article columns as categorical, i.e. arrow dictionary :
+    each distinct text is stored once, rows only hold an index (in parquet & once read back)
+    """
+    return articles.with_columns(pl.col(REPEATED).cast(pl.Categorical))
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of the process so far (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def export(
+    db: str | Path = "ukr.db",
+    out: str | Path = "lmd_ukraine.parquet",
+    batch_size: int = 20_000,
+    compression: str = "gzip",
+    **kwargs,
+) -> dict:
+    """Write the joined articles x comments (one row per comment) parquet file
+    Articles without comments are kept, with null comment columns (left join)
+    kwargs : cf. clean_articles(), returns export stats (rows, seconds, peak rss)
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(db)
+    articles = _categorical(load_articles(conn, **kwargs))
+    ids = articles.get_column("article_id")
+    seen = set()
+
+    writer = None
+    rows = 0
+    try:
+        for batch in read_batches(conn, "comments", COMMENTS_SCHEMA, batch_size):
+            comments = pl.from_arrow(batch).lazy()
+            joined = (
+                articles.lazy().join(comments, on="article_id", how="inner").collect()
+            )
+            seen.update(joined.get_column("article_id").unique().to_list())
+            table = joined.to_arrow()
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema, compression=compression)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(table)
+            logging.debug(f"{rows} rows written")
+
+        # articles without any comment row
+        alone = articles.filter(~ids.is_in(list(seen)))
+        empty = pl.from_arrow(COMMENTS_SCHEMA.empty_table())
+        table = alone.join(empty, on="article_id", how="left").to_arrow()
+        if writer is None:
+            writer = pq.ParquetWriter(out, table.schema, compression=compression)
+        writer.write_table(table.cast(writer.schema))
+        rows += len(table)
+    finally:
+        if writer:
+            writer.close()
+        conn.close()
+
+    return {
+        "out": str(out),
+        "articles": len(articles),
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+MANIFEST = "_manifest.json"
+
+
+def comments_of(conn, article_ids: list[int]) -> pl.DataFrame:
+    """Comments of some articles (indexed on article_id)"""
+    cur = conn.execute(
+        f"""SELECT {', '.join(COMMENTS_SCHEMA.names)} FROM comments
+        WHERE article_id IN (SELECT value FROM json_each(?))""",
+        (json.dumps(article_ids),),
+    )
+    columns = list(zip(*cur.fetchall())) or [[] for _ in COMMENTS_SCHEMA]
+    return pl.from_arrow(
+        pa.table(
+            [
+                pa.array(column, type=f.type)
+                for column, f in zip(columns, COMMENTS_SCHEMA)
+            ],
+            schema=COMMENTS_SCHEMA,
+        )
+    )
+
+
+def _fingerprint(df: pl.DataFrame) -> str:
+    """Content hash of a partition (rows sorted), to know if it must be rewritten"""
+    hashes = df.hash_rows(seed=0).rechunk().to_arrow()
+    return hashlib.sha256(hashes.buffers()[1]).hexdigest()
+
+
+def _read_manifest(path: Path) -> dict:
+    manifest = path / MANIFEST
+    if not manifest.exists():
+        return {}
+    manifest = json.loads(manifest.read_text())
+    # hash_rows() is only stable within a polars version
+    return manifest if manifest.get("polars") == pl.__version__ else {}
+
+
+def export_dataset(
+    db: str | Path = "ukr.db",
+    out: str | Path = "lmd_ukraine",
+    row_group_size: int = 32_768,
+    compression: str = "zstd",
+    **kwargs,
+) -> dict:
+    """Write joined articles x comments as a dataset partitioned by article month :
+    out/month=YYYY-MM/part-0.parquet, rows sorted by (article_id, comment_id) so that
+    row groups statistics allow pruning on date & article_id
+    Only partitions whose content changed are (re)written, partitions with no article left
+    are removed, kwargs : cf. clean_articles(), returns export stats
+    """
+    started = time.perf_counter()
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(out)
+    partitions = manifest.get("partitions", {})
+
+    conn = sqlite3.connect(db)
+    articles = _categorical(load_articles(conn, **kwargs)).with_columns(
+        pl.col("date").dt.strftime("%Y-%m").alias("month")
+    )
+    written, kept, rows = [], [], 0
+    try:
+        for (month,), part in sorted(
+            articles.partition_by("month", as_dict=True).items()
+        ):
+            part = part.drop("month")
+            comments = comments_of(conn, part.get_column("article_id").to_list())
+            joined = part.join(comments, on="article_id", how="left").sort(
+                "article_id", "comment_id"
+            )
+            rows += len(joined)
+            fingerprint = _fingerprint(joined)
+            folder = out / f"month={month}"
+            if (
+                partitions.get(month) == fingerprint
+                and (folder / "part-0.parquet").exists()
+            ):
+                kept.append(month)
+                continue
+            folder.mkdir(exist_ok=True)
+            tmp = folder / f"part-0.{os.getpid()}.tmp"
+            joined.write_parquet(
+                tmp,
+                compression=compression,
+                row_group_size=row_group_size,
+                statistics=True,
+            )
+            os.replace(tmp, folder / "part-0.parquet")
+            partitions[month] = fingerprint
+            written.append(month)
+            logging.debug(f"month={month}: {len(joined)} rows written")
+    finally:
+        conn.close()
+
+    removed = [month for month in partitions if month not in written + kept]
+    for month in removed:
+        shutil.rmtree(out / f"month={month}", ignore_errors=True)
+        del partitions[month]
+    tmp = out / f"{MANIFEST}.tmp"
+    tmp.write_text(
+        json.dumps({"polars": pl.__version__, "partitions": partitions}, indent=1)
+    )
+    os.replace(tmp, out / MANIFEST)
+
+    return {
+        "out": str(out),
+        "articles": len(articles),
+        "rows": rows,
+        "written": written,
+        "kept": len(kept),
+        "removed": removed,
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def scan_dataset(
+    path: str | Path = "lmd_ukraine", start: date | None = None, end: date | None = None
+) -> pl.LazyFrame:
+    """Lazy scan of a partitioned dataset (cf. export_dataset()), optionally start <= date <= end :
+    only matching month partitions are read, row groups are pruned on date statistics
+    Further filters (e.g. on article_id) are pushed down to the parquet reader too
+    """
+    lf = pl.scan_parquet(Path(path) / "**" / "*.parquet", hive_partitioning=True)
+    if start:
+        lf = lf.filter(
+            pl.col("month") >= start.strftime("%Y-%m"), pl.col("date") >= start
+        )
+    if end:
+        lf = lf.filter(pl.col("month") <= end.strftime("%Y-%m"), pl.col("date") <= end)
+    return lf
+
+
+def export_tables(
+    db: str | Path = "ukr.db",
+    out: str | Path = "lmd_ukraine_tables",
+    batch_size: int = 20_000,
+    compression: str = "zstd",
+    **kwargs,
+) -> dict:
+    """Write out/articles.parquet (cleaned articles) & out/comments.parquet (comments of these
+    articles, streamed by batches), cf. scan_joined(), kwargs : cf. clean_articles()
+    """
+    started = time.perf_counter()
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db)
+    articles = load_articles(conn, **kwargs)
+    articles.write_parquet(out / "articles.parquet", compression=compression)
+    ids = articles.select("article_id").lazy()
+
+    rows = 0
+    try:
+        with pq.ParquetWriter(
+            out / "comments.parquet", COMMENTS_SCHEMA, compression=compression
+        ) as writer:
+            for batch in read_batches(conn, "comments", COMMENTS_SCHEMA, batch_size):
+                comments = (
+                    pl.from_arrow(batch)
+                    .lazy()
+                    .join(ids, on="article_id", how="semi")
+                    .collect()
+                )
+                writer.write_table(comments.to_arrow().cast(COMMENTS_SCHEMA))
+                rows += len(comments)
+    finally:
+        conn.close()
+
+    return {
+        "out": str(out),
+        "articles": len(articles),
+        "rows": rows,
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def scan_joined(
+    path: str | Path = "lmd_ukraine_tables", categorical: bool = True
+) -> pl.LazyFrame:
+    """Joined articles x comments view (as export()) of a normalised export, lazily :
+    filters / projections are pushed down to both tables before the join
+    categorical : repeated article columns as categorical (cf. REPEATED), much less memory
+    """
+    path = Path(path)
+    articles = pl.scan_parquet(path / "articles.parquet")
+    if categorical:
+        articles = articles.with_columns(pl.col(REPEATED).cast(pl.Categorical))
+    comments = pl.scan_parquet(path / "comments.parquet")
+    return articles.join(comments, on="article_id", how="left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export sqlite dataset to parquet")
+    parser.add_argument("--db", default="ukr.db")
+    parser.add_argument("--out", default="lmd_ukraine.parquet")
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument(
+        "--compression",
+        default=None,
+        help="default gzip, zstd if --partitioned / --tables",
+    )
+    parser.add_argument(
+        "--start", default=START.isoformat(), help="YYYY-MM-DD, '' for all"
+    )
+    parser.add_argument("--premium-chars", type=int, default=PREMIUM_CHARS)
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="month partitioned dataset, --out is a folder",
+    )
+    parser.add_argument("--row-group-size", type=int, default=32_768)
+    parser.add_argument(
+        "--tables",
+        action="store_true",
+        help="articles & comments tables, --out is a folder",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO
+    )
+    start = datetime.strptime(args.start, "%Y-%m-%d").date() if args.start else None
+    if args.partitioned:
+        stats = export_dataset(
+            args.db,
+            args.out,
+            row_group_size=args.row_group_size,
+            compression=args.compression or "zstd",
+            start=start,
+            premium_chars=args.premium_chars,
+        )
+        logging.info(
+            f"partitions written: {stats['written']}, unchanged: {stats['kept']}, "
+            f"removed: {stats['removed']}"
+        )
+    elif args.tables:
+        stats = export_tables(
+            args.db,
+            args.out,
+            batch_size=args.batch_size,
+            compression=args.compression or "zstd",
+            start=start,
+            premium_chars=args.premium_chars,
+        )
+    else:
+        stats = export(
+            args.db,
+            args.out,
+            batch_size=args.batch_size,
+            compression=args.compression or "gzip",
+            start=start,
+            premium_chars=args.premium_chars,
+        )
+    logging.info(
+        f"{stats['rows']} rows ({stats['articles']} articles) "
+        f"written to {stats['out']} in {stats['seconds']}s, "
+        f"peak rss {stats['peak_rss_mb']} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import json
+import sqlite3
+import threading
+import time
+
+from .enums import State
+
+
+class Frontier:
+    """Persistent, resumable crawl frontier : a SQLite backed queue of urls
+    One row per (url, kind), kind being e.g. "article" or "comments", so urls are deduplicated
+    State : pending -> in_flight -> done | failed | retry (after "retry_after" timestamp)
+    Higher priority first, then insertion order.
+
+    On init, urls this worker left in_flight (crash, Ctrl+C ..) are put back to pending :
+    a crawl just picks up where it left off. Claims are tagged with the worker name
+    (Frontier(.., worker=..), default None) : processes sharing a file need distinct names,
+    or their in_flight urls would be taken as left behind.
+
+    Several workers (processes, cf. lmd_ukr.worker) can share the same frontier file :
+    claim(.., worker=.., lease=seconds) leases urls, an expired lease (dead worker) makes
+    them claimable again. Claims are serialized by SQLite (BEGIN IMMEDIATE, WAL journal).
+
+    Usage:
+    ------
+    frontier = Frontier("data/frontier.db", worker="articles")
+    api = Api(lmd_m=lmd_m, lmd_s=lmd_s, frontier=frontier)  # search results feed the frontier
+    api.search("ukraine", "24/02/2022", "03/03/2022")
+    while batch := frontier.claim("article", n=10):
+        for url, payload in batch:
+            ...
+            frontier.done(url, "article")
+    """
+
+    def __init__(
+        self,
+        path: str = "data/frontier.db",
+        max_attempts: int = 3,
+        worker: str | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.worker = worker
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS frontier (
+                url text,
+                kind text,
+                state text DEFAULT 'pending',
+                priority integer DEFAULT 0,
+                attempts integer DEFAULT 0,
+                retry_after real DEFAULT 0,
+                payload text,
+                error text,
+                updated_at real,
+                worker text,
+                lease_until real,
+                PRIMARY KEY (url, kind)
+                );""")
+            # frontier files created before leases
+            columns = [
+                row[1] for row in self.conn.execute("PRAGMA table_info(frontier)")
+            ]
+            for column, sql_type in (("worker", "text"), ("lease_until", "real")):
+                if column not in columns:
+                    self.conn.execute(
+                        f"ALTER TABLE frontier ADD COLUMN {column} {sql_type};"
+                    )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_frontier_state "
+                "ON frontier (kind, state, priority);"
+            )
+        self.recover()
+
+    def __repr__(self):
+        return f"Frontier({self.stats()})"
+
+    def add(
+        self,
+        urls: list[str],
+        kind: str = "article",
+        priority: int = 0,
+        payload: dict | None = None,
+    ) -> int:
+        """Add urls (if not already known for this kind), return number of new urls"""
+        now = time.time()
+        payload = json.dumps(payload) if payload is not None else None
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                """INSERT OR IGNORE INTO frontier
+                (url, kind, priority, payload, updated_at)
+                VALUES(?,?,?,?,?)""",
+                [(url, kind, priority, payload, now) for url in urls],
+            )
+            return self.conn.total_changes - before
+
+    def claim(
+        self,
+        kind: str = "article",
+        n: int = 1,
+        worker: str | None = None,
+        lease: float | None = None,
+    ) -> list[tuple[str, dict | None]]:
+        """Mark up to n pending (or due for retry, or with an expired lease) urls as in_flight
+        Optional worker name (default: self.worker) & lease duration (s),
+        return [(url, payload)]
+        """
+        worker = worker if worker is not None else self.worker
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            rows = self.conn.execute(
+                """SELECT url, payload FROM frontier
+                WHERE kind = ? AND (
+                    state = ?
+                    OR (state = ? AND retry_after <= ?)
+                    OR (state = ? AND lease_until < ?)
+                )
+                ORDER BY priority DESC, rowid LIMIT ?""",
+                (
+                    kind,
+                    State.PENDING.value,
+                    State.RETRY.value,
+                    now,
+                    State.IN_FLIGHT.value,
+                    now,
+                    n,
+                ),
+            ).fetchall()
+            self.conn.executemany(
+                """UPDATE frontier SET state = ?, attempts = attempts + 1,
+                updated_at = ?, worker = ?, lease_until = ?
+                WHERE url = ? AND kind = ?""",
+                [
+                    (
+                        State.IN_FLIGHT.value,
+                        now,
+                        worker,
+                        now + lease if lease else None,
+                        url,
+                        kind,
+                    )
+                    for url, _ in rows
+                ],
+            )
+        return [
+            (url, json.loads(payload) if payload else None) for url, payload in rows
+        ]
+
+    def done(self, url: str, kind: str = "article"):
+        self._set(url, kind, State.DONE)
+
+    def fail(
+        self,
+        url: str,
+        kind: str = "article",
+        error: str | None = None,
+        retry_in: float | None = None,
+    ):
+        """Failed url : retry in "retry_in" seconds if any attempt left, else failed for good
+        (unknown url : nothing to do, as for done())
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT attempts FROM frontier WHERE url = ? AND kind = ?", (url, kind)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0]
+            retry = retry_in is not None and attempts < self.max_attempts
+            self.conn.execute(
+                """UPDATE frontier SET state = ?, retry_after = ?, error = ?,
+                updated_at = ?
+                WHERE url = ? AND kind = ?""",
+                (
+                    State.RETRY.value if retry else State.FAILED.value,
+                    time.time() + retry_in if retry else 0,
+                    error,
+                    time.time(),
+                    url,
+                    kind,
+                ),
+            )
+
+    def _set(self, url: str, kind: str, state: State):
+        with self._lock, self.conn:
+            self.conn.execute(
+                """UPDATE frontier SET state = ?, updated_at = ?
+                WHERE url = ? AND kind = ?""",
+                (state.value, time.time(), url, kind),
+            )
+
+    def renew(self, urls: list[str], kind: str = "article", lease: float = 600):
+        """Extend the lease of urls still being worked on"""
+        until = time.time() + lease
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """UPDATE frontier SET lease_until = ?
+                WHERE url = ? AND kind = ? AND state = ?""",
+                [(until, url, kind, State.IN_FLIGHT.value) for url in urls],
+            )
+
+    def recover(self) -> int:
+        """Put urls this worker left in_flight (without a live lease) back to pending,
+        return their number. Urls claimed by other workers are left alone (a live worker
+        may still be on them), they are claimable again once their lease expires.
+        """
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                """UPDATE frontier SET state = ?
+                WHERE state = ? AND worker IS ?
+                AND (lease_until IS NULL OR lease_until < ?)""",
+                (State.PENDING.value, State.IN_FLIGHT.value, self.worker, time.time()),
+            )
+            return cursor.rowcount
+
+    def stats(self, kind: str | None = None) -> dict:
+        """Number of urls per state"""
+        sql = "SELECT state, COUNT(*) FROM frontier"
+        params = ()
+        if kind:
+            sql += " WHERE kind = ?"
+            params = (kind,)
+        with self._lock:
+            rows = self.conn.execute(f"{sql} GROUP BY state", params).fetchall()
+        return dict(rows)
+
+    def close(self):
+        self.conn.close()
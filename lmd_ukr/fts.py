@@ -0,0 +1,122 @@
+"""
+Full text search (SQLite FTS5) over articles & comments of the dataset db (cf. build_sqlite_dataset)
+
+articles_fts / comments_fts are external content tables : they index articles / comments
+rows without copying them, and triggers keep them in sync with inserts, upserts and deletes.
+Tokenizer is unicode61 with accents folded (remove_diacritics 2), text being NFKD normalised
+already (cf. parsers.clean) : "armee", "armée" or "Armée" all match.
+
+Usage:
+------
+conn = sqlite3.connect("ukr.db")
+create_fts(conn)  # once, (re)builds the index from existing rows
+hits = search(conn, "armée NEAR(russe)", limit=10)
+hits["articles"][0]  # {"article_id":.., "title":.., "snippet": "...[armée] ...", "rank":..}
+"""
+
+import unicodedata
+
+TOKENIZE = "unicode61 remove_diacritics 2"
+
+# table -> (fts table, indexed columns, rowid column of the content table)
+_FTS = {
+    "articles": ("articles_fts", ("title", "desc", "content"), "article_id"),
+    "comments": ("comments_fts", ("author", "comment"), "id"),
+}
+
+
+def _triggers(table: str) -> list[str]:
+    fts, columns, rowid = _FTS[table]
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete = (
+        f"INSERT INTO {fts} ({fts}, rowid, {cols}) "
+        f"VALUES('delete', old.{rowid}, {old});"
+    )
+    insert = f"INSERT INTO {fts} (rowid, {cols}) VALUES(new.{rowid}, {new});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_{suffix} AFTER {event} ON {table} "
+        f"BEGIN {body} END;"
+        for suffix, event, body in (
+            ("ai", "INSERT", insert),
+            ("ad", "DELETE", delete),
+            ("au", "UPDATE", f"{delete} {insert}"),
+        )
+    ]
+
+
+def create_fts(conn, rebuild: bool = True):
+    """Create FTS5 tables & sync triggers (if not exist), then (re)build the index from rows
+    (a single 'rebuild' is much faster than firing triggers row by row during a bulk load)
+    A newly created FTS table is always built
+    Indexed rowids are INTEGER PRIMARY KEY columns, stable across VACUUM
+    (comments.id, cf. build_sqlite_dataset.migrate_comments)
+    """
+    with conn:
+        for table, (fts, columns, rowid) in _FTS.items():
+            exists = _exists(conn, fts)
+            conn.execute(f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {", ".join(columns)},
+                content='{table}',
+                content_rowid='{rowid}',
+                tokenize='{TOKENIZE}'
+                );""")
+            for trigger in _triggers(table):
+                conn.execute(trigger)
+            if rebuild or not exists:
+                conn.execute(f"INSERT INTO {fts} ({fts}) VALUES('rebuild');")
+
+
+def _exists(conn, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def has_fts(conn) -> bool:
+    return _exists(conn, "articles_fts")
+
+
+def _query(query: str) -> str:
+    """Normalise query as indexed text (NFKD, cf. parsers.clean)"""
+    return unicodedata.normalize("NFKD", query)
+
+
+def search_articles(conn, query: str, limit: int = 20, tokens: int = 12) -> list[dict]:
+    """Articles matching an FTS5 query, best first (bm25, title weighs more than content)
+    with a snippet of the content around matches
+    """
+    sql = """SELECT a.article_id, a.url, a.title, a.date,
+        snippet(articles_fts, 2, '[', ']', '…', ?) AS snippet,
+        bm25(articles_fts, 10.0, 5.0, 1.0) AS rank
+        FROM articles_fts JOIN articles a ON a.article_id = articles_fts.rowid
+        WHERE articles_fts MATCH ?
+        ORDER BY rank LIMIT ?"""
+    return _fetch(conn, sql, (tokens, _query(query), limit))
+
+
+def search_comments(conn, query: str, limit: int = 20, tokens: int = 12) -> list[dict]:
+    """Comments matching an FTS5 query, best first (bm25), with a snippet"""
+    sql = """SELECT c.article_id, c.comment_id, c.author,
+        snippet(comments_fts, 1, '[', ']', '…', ?) AS snippet,
+        bm25(comments_fts) AS rank
+        FROM comments_fts JOIN comments c ON c.id = comments_fts.rowid
+        WHERE comments_fts MATCH ?
+        ORDER BY rank LIMIT ?"""
+    return _fetch(conn, sql, (tokens, _query(query), limit))
+
+
+def search(conn, query: str, limit: int = 20) -> dict[str, list[dict]]:
+    """Articles & comments hits of a query, cf. search_articles(), search_comments()"""
+    return {
+        "articles": search_articles(conn, query, limit),
+        "comments": search_comments(conn, query, limit),
+    }
+
+
+def _fetch(conn, sql: str, params: tuple) -> list[dict]:
+    cur = conn.execute(sql, params)
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur]
@@ -0,0 +1,158 @@
+import asyncio
+import random
+import threading
+import time
+
+from .enums import Endpoint
+
+
+class Bucket:
+    """Token bucket for a single endpoint class, rate expressed in requests/mn
+    Tokens are reserved (may go negative) so that concurrent callers (threads, tasks)
+    each get their own slot in time instead of all waking up together.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.ceiling = per_minute
+        self.rate = per_minute
+        self.burst = burst
+        self.tokens = burst
+        self.last = time.monotonic()
+        self.cooldown_until = 0.0
+        self.latency = None
+        self.baseline = None
+
+    def reserve(self) -> float:
+        """Take a token, return how long (s) the caller must wait before using it
+        Tokens only accrue from "last", which is moved to the end of a cooldown (cf. cool_down)
+        """
+        now = time.monotonic()
+        if now > self.last:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.last) * self.rate / 60
+            )
+            self.last = now
+        self.tokens -= 1
+        wait = -self.tokens * 60 / self.rate if self.tokens < 0 else 0.0
+        return max(wait + self.last - now, self.cooldown_until - now)
+
+    def cool_down(self, until: float):
+        """No request before "until" (monotonic time), then the (halved) rate applies :
+        previous reservations are dropped, callers re-reserve once awake (cf. Governor.wait)
+        """
+        self.cooldown_until = max(self.cooldown_until, until)
+        self.last = max(self.last, self.cooldown_until)
+        self.tokens = 1
+
+
+class Governor:
+    """Rate limits governor, one token bucket per endpoint class (search, article, comments)
+    Adapts to server responses (AIMD) :
+    - 429 / 503 : rate is halved and the endpoint cools down for "cooldown" seconds
+      (or the Retry-After of the response, if any)
+    - rising latency (> "slow_factor" x baseline) : rate is reduced by 20%
+    - healthy response : rate slowly increases again, up to the configured one
+
+    Defaults stay under what we observed (cf. Api docstring) :
+    ./recherche? < ~30 requests/mn, higher on articles & comments.
+
+    Usage:
+    ------
+    governor = Governor(search=20, article=40, comments=40)
+    api = Api(lmd_m=lmd_m, lmd_s=lmd_s, governor=governor)
+    """
+
+    def __init__(
+        self,
+        search: float = 25,
+        article: float = 45,
+        comments: float = 45,
+        burst: int = 1,
+        min_factor: float = 0.1,
+        cooldown: float = 60,
+        slow_factor: float = 2.0,
+        jitter: float = 0.1,
+    ):
+        self.buckets = {
+            Endpoint.SEARCH: Bucket(search, burst),
+            Endpoint.ARTICLE: Bucket(article, burst),
+            Endpoint.COMMENTS: Bucket(comments, burst),
+        }
+        self.min_factor = min_factor
+        self.cooldown = cooldown
+        self.slow_factor = slow_factor
+        self.jitter = jitter
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        rates = {e.value: round(b.rate, 1) for e, b in self.buckets.items()}
+        return f"Governor(requests/mn: {rates})"
+
+    def reserve(self, endpoint: Endpoint) -> float:
+        """Reserve a slot for endpoint, return delay (s) to wait before the request"""
+        with self._lock:
+            delay = self.buckets[endpoint].reserve()
+        return delay * (1 + random.uniform(0, self.jitter)) if delay else 0.0
+
+    def cooling(self, endpoint: Endpoint) -> bool:
+        """Is endpoint in a cooldown (429 / 503) right now"""
+        return time.monotonic() < self.buckets[endpoint].cooldown_until
+
+    def wait(self, endpoint: Endpoint) -> float:
+        """Blocking wait (sync Api), return time slept
+        A cooldown started while sleeping voids the reservation : wait & reserve again
+        """
+        slept = 0.0
+        while True:
+            delay = self.reserve(endpoint)
+            if delay:
+                time.sleep(delay)
+            slept += delay
+            if not self.cooling(endpoint):
+                return slept
+
+    async def async_wait(self, endpoint: Endpoint) -> float:
+        """Non blocking wait (AsyncApi), return time slept, cf. wait()"""
+        slept = 0.0
+        while True:
+            delay = self.reserve(endpoint)
+            if delay:
+                await asyncio.sleep(delay)
+            slept += delay
+            if not self.cooling(endpoint):
+                return slept
+
+    def feedback(
+        self,
+        endpoint: Endpoint,
+        status_code: int,
+        latency: float,
+        retry_after: float | None = None,
+    ):
+        """Adjust endpoint rate given server response (status code, latency in s)
+        On 429 / 503, the cooldown is the server Retry-After (s) if any
+        """
+        with self._lock:
+            bucket = self.buckets[endpoint]
+            floor = bucket.ceiling * self.min_factor
+
+            if status_code in (429, 503):
+                bucket.rate = max(floor, bucket.rate / 2)
+                cooldown = self.cooldown if retry_after is None else retry_after
+                bucket.cool_down(time.monotonic() + cooldown)
+                return
+
+            bucket.latency = (
+                latency
+                if bucket.latency is None
+                else 0.8 * bucket.latency + 0.2 * latency
+            )
+            bucket.baseline = (
+                bucket.latency
+                if bucket.baseline is None
+                else min(bucket.latency, 0.99 * bucket.baseline + 0.01 * bucket.latency)
+            )
+            if bucket.latency > self.slow_factor * bucket.baseline:
+                bucket.rate = max(floor, bucket.rate * 0.8)
+            else:
+                bucket.rate = min(bucket.ceiling, bucket.rate + bucket.ceiling * 0.05)
@@ -0,0 +1,175 @@
+from collections import Counter
+from dataclasses import dataclass
+import json
+import threading
+import time
+from typing import Callable
+
+# where time goes, for a single fetch (parse : separate observations)
+PHASES = ("queue", "rate_limit", "retry", "network", "redirect", "parse")
+
+
+@dataclass
+class Timing:
+    """One observation, times in s
+    - queue : waiting for a worker / connection slot (thread pool, per-host semaphore)
+    - rate_limit : Governor sleep
+    - retry : backoff sleep before this attempt (cf. Retry), each attempt is an observation
+    - network : request, up to the response body
+    - redirect : following redirect(s)
+    - parse : html parsing, selectors (status is None for parse observations)
+    cache : "store" (replay), "not_modified" (304, validators), None
+    """
+
+    endpoint: str
+    url: str | None = None
+    status: int | None = None
+    queue: float = 0.0
+    rate_limit: float = 0.0
+    retry: float = 0.0
+    network: float = 0.0
+    redirect: float = 0.0
+    parse: float = 0.0
+    bytes: int = 0
+    cache: str | None = None
+
+
+class Metrics:
+    """Counters & timings of an Api (thread safe), cf. Api(metrics=Metrics())
+    - responses by endpoint class & status code, bytes transferred
+    - total time per phase (cf. Timing) & endpoint class
+    - cache hits / misses (validators : 304 v. 200, store : replay, aliases : moved urls)
+    Every Timing is also passed to "callback", if any (e.g. tracing, a live dashboard)
+
+    Usage:
+    ------
+    metrics = Metrics(callback=lambda timing: ...)
+    api = Api(lmd_m=lmd_m, lmd_s=lmd_s, metrics=metrics)
+    ...
+    metrics.snapshot()  # dict, metrics.to_json() / metrics.to_prometheus() for text
+    """
+
+    def __init__(self, callback: Callable[[Timing], None] | None = None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.responses = Counter()  # (endpoint, status)
+            self.bytes = Counter()  # endpoint
+            self.seconds = Counter()  # (endpoint, phase)
+            self.observations = Counter()  # (endpoint, phase)
+            self.caches = Counter()  # (cache, "hit" | "miss")
+
+    def __repr__(self):
+        requests = sum(self.responses.values())
+        statuses = Counter()
+        for (_, status), n in self.responses.items():
+            statuses[status] += n
+        network = sum(v for (_, phase), v in self.seconds.items() if phase == "network")
+        mean = network / requests * 1000 if requests else 0.0
+        return (
+            f"Metrics(requests: {requests} {dict(statuses)}, "
+            f"{sum(self.bytes.values()) / 2**20:.1f} MB, network {mean:.0f} ms/request)"
+        )
+
+    def observe(self, timing: Timing):
+        with self._lock:
+            if timing.status is not None:
+                self.responses[(timing.endpoint, timing.status)] += 1
+            self.bytes[timing.endpoint] += timing.bytes
+            for phase in PHASES:
+                value = getattr(timing, phase)
+                if value:
+                    self.seconds[(timing.endpoint, phase)] += value
+                    self.observations[(timing.endpoint, phase)] += 1
+        if self.callback:
+            self.callback(timing)
+
+    def cache(self, name: str, hit: bool):
+        with self._lock:
+            self.caches[(name, "hit" if hit else "miss")] += 1
+
+    def snapshot(self) -> dict:
+        """All metrics as a (json serializable) dict"""
+        with self._lock:
+            snapshot = {
+                "uptime": round(time.time() - self.started, 3),
+                "responses": {},
+                "bytes": dict(self.bytes),
+                "seconds": {},
+                "mean_ms": {},
+                "caches": {},
+            }
+            for (endpoint, status), n in sorted(self.responses.items()):
+                snapshot["responses"].setdefault(endpoint, {})[str(status)] = n
+            for (endpoint, phase), seconds in sorted(self.seconds.items()):
+                n = self.observations[(endpoint, phase)]
+                snapshot["seconds"].setdefault(endpoint, {})[phase] = round(seconds, 6)
+                snapshot["mean_ms"].setdefault(endpoint, {})[phase] = round(
+                    seconds / n * 1000, 3
+                )
+            for name in sorted({name for name, _ in self.caches}):
+                hits, misses = self.caches[(name, "hit")], self.caches[(name, "miss")]
+                snapshot["caches"][name] = {
+                    "hit": hits,
+                    "miss": misses,
+                    "hit_rate": round(hits / (hits + misses), 4),
+                }
+        return snapshot
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix: str = "lmd_ukr") -> str:
+        """Prometheus text exposition format (e.g. served by a /metrics endpoint)"""
+        with self._lock:
+            families = [
+                (
+                    "responses_total",
+                    "Responses by endpoint class and status code",
+                    [
+                        ({"endpoint": e, "status": str(s)}, n)
+                        for (e, s), n in sorted(self.responses.items())
+                    ],
+                ),
+                (
+                    "bytes_total",
+                    "Bytes received by endpoint class",
+                    [({"endpoint": e}, n) for e, n in sorted(self.bytes.items())],
+                ),
+                (
+                    "phase_seconds_total",
+                    "Time spent by endpoint class and phase",
+                    [
+                        ({"endpoint": e, "phase": p}, round(v, 6))
+                        for (e, p), v in sorted(self.seconds.items())
+                    ],
+                ),
+                (
+                    "phase_observations_total",
+                    "Observations by endpoint class and phase",
+                    [
+                        ({"endpoint": e, "phase": p}, n)
+                        for (e, p), n in sorted(self.observations.items())
+                    ],
+                ),
+                (
+                    "cache_total",
+                    "Cache lookups by cache and result",
+                    [
+                        ({"cache": c, "result": r}, n)
+                        for (c, r), n in sorted(self.caches.items())
+                    ],
+                ),
+            ]
+        lines = []
+        for name, help, samples in families:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                label = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{{{label}}} {value}")
+        return "\n".join(lines) + "\n"
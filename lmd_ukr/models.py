@@ -0,0 +1,166 @@
+from collections import Counter
+from dataclasses import dataclass, field
+import hashlib
+
+
+@dataclass
+class Search:
+    query: str
+    url: str
+    is_result: bool
+    pages: int
+    retrieved: int
+    results: list
+
+
+@dataclass
+class Article:
+    url: str
+    title: str
+    desc: str
+    content: str
+    article_id: int
+    date: str
+    keywords: list[str]
+    article_type: str
+    allow_comments: bool
+    premium: bool
+
+
+@dataclass(slots=True)
+class Comments:
+    """Comments of an article, column-wise : authors[i] wrote contents[i]
+    (two lists of str instead of one small dict per comment, matters for 10k+ comments articles)
+    ids[i] is the site comment id, None if not found in the markup (cf. comment_ids())
+    No comment : empty columns, len(comments) == 0 (the object itself stays truthy)
+    slots : no __dict__, use dataclasses.asdict()
+
+    Exports : rows() (sqlite executemany), to_arrow() (RecordBatch), to_polars()
+    """
+
+    article_id: int
+    count: int
+    authors: list[str] = field(default_factory=list)
+    contents: list[str] = field(default_factory=list)
+    ids: list[str | None] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.authors)
+
+    def __bool__(self):
+        # a Comments is truthy, even without comment (as before __len__),
+        # use len() to test
+        return True
+
+    @property
+    def comments(self) -> list[dict]:
+        """Row-wise view [{"author":.., "content":..}, ..], built on demand"""
+        return [
+            {"author": author, "content": content}
+            for author, content in zip(self.authors, self.contents)
+        ]
+
+    def extend(
+        self,
+        authors: list[str],
+        contents: list[str],
+        ids: list[str | None] | None = None,
+    ):
+        self.authors.extend(authors)
+        self.contents.extend(contents)
+        self.ids.extend(ids if ids is not None else [None] * len(authors))
+
+    def truncate(self, n: int):
+        """Keep the first n comments (newest first)"""
+        del self.authors[n:], self.contents[n:], self.ids[n:]
+
+    def comment_ids(self) -> list[str]:
+        """Stable identity of each comment, cf. comment_ids()"""
+        return comment_ids(self.article_id, self.authors, self.contents, self.ids)
+
+    def ordinals(self) -> Counter:
+        """Number of comments per (author, content) digest, cf. comment_ids(seen=..)
+        taken from the ids themselves, so it holds for deltas with ids set too
+        """
+        seen = Counter()
+        prefix = f"{self.article_id}:"
+        for comment_id in self.comment_ids():
+            if comment_id.startswith(prefix) and comment_id.count(":") == 2:
+                _, digest, n = comment_id.split(":")
+                seen[digest] = max(seen[digest], int(n) + 1)
+        return seen
+
+    def rows(self):
+        """(article_id, comment_id, author, content) tuples, e.g. for sqlite executemany()"""
+        article_id = self.article_id
+        for comment_id, author, content in zip(
+            self.comment_ids(), self.authors, self.contents
+        ):
+            yield article_id, comment_id, author, content
+
+    def to_arrow(self):
+        """pyarrow RecordBatch (article_id, comment_id, author, comment)"""
+        import pyarrow as pa
+
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.repeat(pa.scalar(self.article_id, pa.int64()), len(self)),
+                pa.array(self.comment_ids(), pa.string()),
+                pa.array(self.authors, pa.string()),
+                pa.array(self.contents, pa.string()),
+            ],
+            names=["article_id", "comment_id", "author", "comment"],
+        )
+
+    def to_polars(self):
+        """polars DataFrame (article_id, comment_id, author, comment), zero-copy from arrow"""
+        import polars as pl
+
+        return pl.from_arrow(self.to_arrow())
+
+    @classmethod
+    def from_dict(cls, comments: dict):
+        """From asdict() / json, either column-wise or (older files) row-wise "comments" """
+        if "comments" in comments:
+            rows = [c for c in comments["comments"] if c]
+            return cls(
+                article_id=comments["article_id"],
+                count=comments["count"],
+                authors=[c["author"] for c in rows],
+                contents=[c["content"] for c in rows],
+            )
+        comments = cls(**comments)
+        if len(comments.ids) != len(comments.authors):
+            comments.ids = [None] * len(comments.authors)  # files saved before ids
+        return comments
+
+
+def _digest(author: str, content: str) -> str:
+    return hashlib.sha1(f"{author}\x1f{content}".encode()).hexdigest()[:16]
+
+
+def comment_ids(
+    article_id: int,
+    authors: list[str],
+    contents: list[str],
+    ids: list[str | None] | None = None,
+    seen: Counter | None = None,
+) -> list[str]:
+    """Stable comment identity : the site comment id if any, else
+    "<article_id>:<hash of author & content>:<n>", n-th identical comment counted from the
+    oldest one (pages are newest first, so ids don't move when new comments are posted,
+    unlike a page / position)
+    seen : identical comments already known, e.g. previous.ordinals() for a refresh delta,
+    so that a new "+1" doesn't get the id of the oldest one
+    """
+    ids = ids if ids and len(ids) == len(authors) else [None] * len(authors)
+    seen = Counter(seen)
+    result = [None] * len(authors)
+    for index in range(len(authors) - 1, -1, -1):
+        if ids[index]:
+            result[index] = str(ids[index])
+            continue
+        digest = _digest(authors[index], contents[index])
+        result[index] = f"{article_id}:{digest}:{seen[digest]}"
+        seen[digest] += 1
+    return result
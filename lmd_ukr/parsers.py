@@ -0,0 +1,218 @@
+import json
+import unicodedata
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .enums import Css
+from .exceptions import MetadataError
+from .models import Article
+
+
+def clean(string) -> str | None:
+    """Util :remove white spaces / special char from content string"""
+    string = unicodedata.normalize("NFKD", string) if string else None
+    return " ".join(string.split()) if string else None
+
+
+# all article selectors at once, a single query over the tree
+# (nodes come back grouped by selector, each group in document order)
+_ARTICLE_SELECTOR = ", ".join(
+    css.value.strip()
+    for css in (
+        Css.A_TITLE,
+        Css.A_DESC,
+        Css.A_CONTENT,
+        Css.A_COMS_ALLOWED,
+        Css.A_METADATA,
+    )
+)
+_PARAGRAPH = Css.A_CONTENT.value.strip().split(".")[1]
+_DESC = Css.A_DESC.value.split(".")[1]
+
+
+def parse_article_html(html) -> dict:
+    """Single pass article parser : title, desc, paragraphs (content), comments flag
+    and metadata script text, each text node being normalised (clean) only once
+    Missing nodes are None (False for "allow_comments"), no exception raised
+    """
+    title = desc = script = None
+    paragraphs = []
+    allow_comments = False
+    for node in html.css(_ARTICLE_SELECTOR):
+        tag = node.tag
+        if tag == "p":
+            classes = (node.attributes.get("class") or "").split()
+            if _PARAGRAPH in classes:
+                text = clean(node.text())
+                if text is not None:
+                    paragraphs.append(text)
+            elif _DESC in classes and desc is None:
+                desc = clean(node.text())
+        elif tag == "h1":
+            if title is None:
+                title = clean(node.text())
+        elif tag == "a":
+            allow_comments = True
+        elif tag == "script" and script is None:
+            text = node.text()
+            if _META_MARKER in text:
+                script = text
+    return {
+        "title": title,
+        "desc": desc,
+        "content": " ".join(paragraphs),
+        "allow_comments": allow_comments,
+        "script": script,
+    }
+
+
+# metadata script : first inline script holding the analytics "smart_tag" object
+_META_MARKER = '"smart_tag"'
+
+# extraction plan, field -> path in the metadata json object
+_META_PLAN = (
+    ("article_id", ("analytics", "smart_tag", "customObject", "ID_Article")),
+    ("date", ("context", "article", "firstPublished", "date")),
+    ("keywords", ("analytics", "smart_tag", "tags", "keywords")),
+    ("article_type", ("analytics", "smart_tag", "customObject", "Nature_edito")),
+    ("suscribe", ("analytics", "smart_tag", "customObject", "Statut_article")),
+)
+
+_decoder = json.JSONDecoder()
+
+
+def find_metadata_script(html) -> str | None:
+    """Text of the metadata script, None if the page has none"""
+    for node in html.css(Css.A_METADATA.value):
+        text = node.text()
+        if _META_MARKER in text:
+            return text
+    return None
+
+
+def _json_object(script: str) -> dict:
+    """Decode the (first) json object of a script, orjson if installed"""
+    start = script.find("{")
+    if start < 0:
+        raise MetadataError("no json object in metadata script")
+    if orjson:
+        try:
+            return orjson.loads(script[start : script.rfind("}") + 1])
+        except orjson.JSONDecodeError:
+            pass  # trailing js after the object, decode the object only
+    try:
+        return _decoder.raw_decode(script, start)[0]
+    except json.JSONDecodeError as e:
+        raise MetadataError(f"invalid json ({e})")
+
+
+def parse_metadata(script: str | None, filter_by: str | None = None) -> dict:
+    """Metadata (article id, date, keywords ..) from the metadata script text, cf. Api.get_metadata
+    Raises MetadataError (no script, bad json, missing field)
+    """
+    if not script:
+        raise MetadataError("no metadata script")
+    dict_meta = _json_object(script)
+    meta = {}
+    for field, path in _META_PLAN:
+        value = dict_meta
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, TypeError, IndexError):
+            raise MetadataError(f"missing {'.'.join(path)}", field=field)
+        meta[field] = value
+    if filter_by:
+        meta["tags_contain"] = {
+            "tag": filter_by,
+            "is_tag": True if filter_by in meta["keywords"] else False,
+        }
+    return meta
+
+
+def parse_article(url: str, html) -> Article:
+    """Parse an article html into an Article()"""
+    parsed = parse_article_html(html)
+    try:
+        meta = parse_metadata(parsed["script"])
+    except MetadataError as e:
+        e.url = url
+        raise
+    return Article(
+        url=url,
+        title=parsed["title"],
+        desc=parsed["desc"],
+        content=parsed["content"],
+        article_id=meta["article_id"],
+        date=meta["date"],
+        keywords=meta["keywords"],
+        article_type=meta["article_type"],
+        allow_comments=parsed["allow_comments"],
+        premium=True if meta["suscribe"] == "Abo" else False,
+    )
+
+
+def parse_search_probe(html) -> tuple[bool, int]:
+    """From first search page : is there any result, and how many pages (river)"""
+    is_result = True if not html.css_first(Css.S_IS_RESULT.value) else False
+    river = True if html.css(Css.S_RIVER.value) else False
+    n_pages = int(html.css(Css.S_PAGES.value)[-1].text()) if river else 1
+    return is_result, n_pages
+
+
+def parse_search_page(html) -> list[dict]:
+    """Parse urls, titles of a search page"""
+    urls = [url.attributes["href"] for url in html.css(Css.S_URL.value)]
+    titles = [title.text() for title in html.css(Css.S_TITLE.value)]
+    return [{"url": a_url, "title": a_title} for a_url, a_title in zip(urls, titles)]
+
+
+def parse_comments_probe(html) -> tuple[int, int] | None:
+    """From first ?contributions page : (count, n_pages), None if no comment"""
+    if not html.css_first(Css.C_IS_COMMENT.value):
+        return None
+    river = True if html.css(Css.C_RIVER.value) else False
+    count_str = html.css_first(Css.C_COUNT.value).text()
+    count = int("".join(list(filter(str.isdigit, count_str))))
+    n_pages = int(html.css(Css.C_PAGES.value)[-1].text()) if river else 1
+    return count, n_pages
+
+
+# attributes holding the site comment id, on the comment node
+_COMMENT_ID_ATTRS = ("data-comment-id", "data-id", "id")
+
+
+def _comment_id(node) -> str | None:
+    attributes = node.attributes
+    for attr in _COMMENT_ID_ATTRS:
+        if attributes.get(attr):
+            return attributes[attr]
+    return None
+
+
+def parse_comments_page(html) -> tuple[list[str], list[str], list[str | None]]:
+    """Parse coms (authors, contents, ids) columns of a ?contributions page
+    ids are the site comment ids, None if the markup has none
+    """
+    nodes = html.css(Css.C_COMMENT.value)
+    if not nodes:
+        # no comment node, authors / contents paired by position
+        authors = [author.text() for author in html.css(Css.C_AUTHOR.value)]
+        contents = [clean(content.text()) for content in html.css(Css.C_CONTENT.value)]
+        # columns of same length, as zip(authors, contents)
+        n = min(len(authors), len(contents))
+        return authors[:n], contents[:n], [None] * n
+
+    authors, contents, ids = [], [], []
+    for node in nodes:
+        author = node.css_first(Css.C_AUTHOR.value)
+        content = node.css_first(Css.C_CONTENT.value)
+        if author is None or content is None:
+            continue
+        authors.append(author.text())
+        contents.append(clean(content.text()))
+        ids.append(_comment_id(node))
+    return authors, contents, ids
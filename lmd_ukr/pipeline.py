@@ -0,0 +1,186 @@
+from collections import deque
+from itertools import islice
+import logging
+import multiprocessing
+import os
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from selectolax.parser import HTMLParser
+
+from .api import Api
+from .enums import Endpoint
+from .exceptions import FetchError, NotModified
+from .models import Article, Comments
+from .parsers import (
+    parse_article,
+    parse_search_page,
+    parse_comments_probe,
+    parse_comments_page,
+)
+
+
+def _parse_comments_probe(url: str, html) -> tuple:
+    """(count, n_pages, columns of page 1), count 0 if no comment (None : failed)"""
+    probe = parse_comments_probe(html)
+    return (*probe, parse_comments_page(html)) if probe else (0, 0, ([], [], []))
+
+
+# kind -> (endpoint class, parser(url, html))
+_KINDS = {
+    "article": (Endpoint.ARTICLE, parse_article),
+    "search": (Endpoint.SEARCH, lambda url, html: parse_search_page(html)),
+    "comments": (Endpoint.COMMENTS, lambda url, html: parse_comments_page(html)),
+    "comments_probe": (Endpoint.COMMENTS, _parse_comments_probe),
+}
+
+
+def parse_raw(kind: str, url: str, raw: bytes):
+    """Parse raw html of url, given its kind (runs in pool processes)
+    None if raw is None (not fetched) or if it can't be parsed (e.g. live / blog pages)
+    """
+    if raw is None:
+        return None
+    try:
+        return _KINDS[kind][1](url, HTMLParser(raw))
+    except Exception as e:
+        logging.warning(f"{url}: {e!r}, not parsed")
+        return None
+
+
+class Pipeline:
+    """Fetch stage (threads, Api._fetch_raw -> raw bytes) decoupled from a parse stage
+    (ProcessPoolExecutor) so parsing scales over all cores instead of being GIL bound,
+    e.g. when replaying a whole HtmlStore archive, or when fetching concurrently.
+
+    Results are streamed (generators), in input order (ordered=True) or as soon as parsed.
+    At most "window" pages are in flight at once, memory stays flat.
+    A page that can't be fetched (or is missing from the store in replay mode) or parsed
+    gives a None result, the stream goes on.
+    Parse processes are spawned (mp_context), not forked from a process with fetch threads.
+
+    Usage:
+    ------
+    with Pipeline(Api(store=HtmlStore(path), replay=True), processes=8) as pipeline:
+        for url, article in pipeline.map("article", urls):
+            ...
+        for comments in pipeline.comments(articles):
+            ...
+    """
+
+    def __init__(
+        self,
+        api: Api,
+        processes: int | None = None,
+        fetch_workers: int | None = None,
+        ordered: bool = True,
+        window: int | None = None,
+        mp_context=None,
+    ):
+        self.api = api
+        self.processes = processes if processes else os.cpu_count()
+        if mp_context is None:
+            mp_context = multiprocessing.get_context("spawn")
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.processes, mp_context=mp_context
+        )
+        self.fetch_workers = fetch_workers if fetch_workers else api.max_workers
+        self.ordered = ordered
+        self.window = window if window else 4 * self.processes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    def _fetch(self, kind: str, url: str) -> tuple[str, bytes | None]:
+        try:
+            return url, self.api._fetch_raw(url, _KINDS[kind][0])
+        except (FetchError, NotModified, KeyError) as e:
+            logging.warning(f"{e}, skipped")
+            return url, None
+
+    def map(self, kind: str, urls, ordered: bool | None = None):
+        """Fetch & parse urls of a given kind ("article", "search", "comments", "comments_probe")
+        yield (url, parsed result), None as result if the page can't be fetched / parsed
+        """
+        ordered = self.ordered if ordered is None else ordered
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers:
+            fetched = self.api._ordered_map(
+                fetchers,
+                lambda url: self._fetch(kind, url),
+                urls,
+                window=self.fetch_workers,
+            )
+            pending = deque() if ordered else set()
+            for url, raw in fetched:
+                future = self.pool.submit(parse_raw, kind, url, raw)
+                future.url = url
+                if ordered:
+                    pending.append(future)
+                    if len(pending) >= self.window:
+                        future = pending.popleft()
+                        yield future.url, future.result()
+                else:
+                    pending.add(future)
+                    if len(pending) >= self.window:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.url, future.result()
+            if ordered:
+                while pending:
+                    future = pending.popleft()
+                    yield future.url, future.result()
+            else:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.url, future.result()
+
+    def articles(self, urls, ordered: bool | None = None):
+        """yield Article (None if not fetched) for each url"""
+        for url, article in self.map("article", urls, ordered=ordered):
+            yield article
+
+    def comments(self, articles: list[Article]):
+        """yield Comments for each article, in order, None if any of its pages failed
+        Probes are fetched / parsed concurrently, "window" articles at a time,
+        then pages of each article
+        """
+        articles = iter(articles)
+        while chunk := list(islice(articles, self.window)):
+            probe_urls = [
+                self.api._comments_url(a) if a.allow_comments else None for a in chunk
+            ]
+            probes = dict(
+                self.map("comments_probe", filter(None, probe_urls), ordered=False)
+            )
+            for article, url in zip(chunk, probe_urls):
+                if url is None:
+                    yield Comments(article_id=article.article_id, count=0)
+                    continue
+                yield self._comments(article, url, probes.get(url))
+
+    def _comments(
+        self, article: Article, url: str, probe: tuple | None
+    ) -> Comments | None:
+        """All comments of article given its parsed probe (from url), None if a page failed"""
+        if probe is None:
+            return None
+        count, n_pages, columns = probe
+        comments = Comments(article.article_id, count, *columns)
+        page_urls = [f"{url}&page={page}" for page in range(2, n_pages + 1)]
+        for page_url, columns in self.map("comments", page_urls, ordered=True):
+            if columns is None:
+                logging.warning(f"{page_url} failed, comments of {article.url} dropped")
+                return None
+            comments.extend(*columns)
+        return comments
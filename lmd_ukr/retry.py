@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import random
+
+from .exceptions import FetchError
+
+
+@dataclass
+class Retry:
+    """Retry policy of Api requests
+    - tries : attempts per url, 1 to disable retries
+    - backoff, max_backoff : exponential backoff (s) between attempts, jittered (50-100%)
+    - max_retry_after : a longer Retry-After is not waited for, RateLimited is raised at once
+    - statuses : retried status codes, network errors (timeouts, connection resets) are retried too
+
+    Each attempt still goes through the Governor (rate limits), a Retry-After also sets
+    the Governor cooldown of that endpoint class.
+
+    Usage:
+    ------
+    api = Api(lmd_m=lmd_m, lmd_s=lmd_s, retry=Retry(tries=5, backoff=2))
+    """
+
+    tries: int = 3
+    backoff: float = 1.0
+    max_backoff: float = 30.0
+    max_retry_after: float = 120.0
+    statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def retryable(self, error: FetchError) -> bool:
+        return error.status is None or error.status in self.statuses
+
+    def delay(self, attempt: int, error: FetchError) -> float | None:
+        """Delay (s) before the attempt following "attempt" (1, 2..) that failed with error,
+        None if error should be raised instead
+        """
+        if attempt >= self.tries or not self.retryable(error):
+            return None
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        ceiling = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return ceiling * random.uniform(0.5, 1)
+
+
+def retry_after(headers) -> float | None:
+    """Retry-After header (delay-seconds or HTTP-date) as a delay in s, None if absent / invalid"""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
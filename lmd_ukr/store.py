@@ -0,0 +1,85 @@
+from pathlib import Path
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+class HtmlStore:
+    """Content-addressed store of raw responses (html bytes), on disk
+    - objects/ : one gzip file per unique content, named after its sha256 digest
+    - index.db : (url, fetched_at, digest), i.e. every fetch of every url
+
+    Used by Api(store=..) to keep raw html while crawling, and by Api(replay=True)
+    to re-parse everything offline (new Css selectors, parsing changes) without re-crawling.
+    """
+
+    def __init__(self, path: str | Path = "data/html_store", compresslevel: int = 6):
+        self.path = Path(path)
+        self.objects = self.path / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path / "index.db", check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS fetches (
+                url text,
+                fetched_at real,
+                digest text
+                );""")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fetches_url "
+                "ON fetches (url, fetched_at);"
+            )
+
+    def __repr__(self):
+        return f"HtmlStore({self.path})"
+
+    def __contains__(self, url: str) -> bool:
+        return self.digest(url) is not None
+
+    def _object(self, digest: str) -> Path:
+        return self.objects / digest[:2] / f"{digest}.gz"
+
+    def put(self, url: str, content: bytes, fetched_at: float | None = None) -> str:
+        """Store content (once per digest) and record the fetch, return digest"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(gzip.compress(content, compresslevel=self.compresslevel))
+            os.replace(tmp, path)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO fetches (url, fetched_at, digest) VALUES(?,?,?)",
+                (url, fetched_at if fetched_at else time.time(), digest),
+            )
+        return digest
+
+    def digest(self, url: str, before: float | None = None) -> str | None:
+        """Digest of the latest fetch of url (optionally fetched before timestamp)"""
+        sql = """SELECT digest FROM fetches WHERE url = ? AND fetched_at <= ?
+        ORDER BY fetched_at DESC LIMIT 1"""
+        with self._lock:
+            row = self.conn.execute(
+                sql, (url, before if before else float("inf"))
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, url: str, before: float | None = None) -> bytes | None:
+        """Raw content of the latest fetch of url, None if never fetched"""
+        digest = self.digest(url, before)
+        return gzip.decompress(self._object(digest).read_bytes()) if digest else None
+
+    def urls(self) -> list[str]:
+        """All urls fetched at least once"""
+        with self._lock:
+            return [
+                row[0] for row in self.conn.execute("SELECT DISTINCT url FROM fetches")
+            ]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,82 @@
+import json
+import sqlite3
+import threading
+
+
+class ValidatorIndex:
+    """Small local index of HTTP validators (ETag / Last-Modified) per url, for cheap re-crawls
+    Along with validators we keep the parsed result (Article, Comments as dict) of that url,
+    so that a 304 Not Modified is a cache hit : no download, no parsing.
+
+    Validators are only sent once a result has been committed for the url
+    (i.e. Api got a 200, parsed it, then called commit()).
+    Api only calls seen() for urls it commits (article, first comments page), so that
+    search pages, comments pages 2..N .. don't pile up in _pending.
+    """
+
+    def __init__(self, path: str = "data/validators.db"):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS validators (
+                url text PRIMARY KEY,
+                etag text,
+                last_modified text,
+                result text
+                );""")
+
+    def __repr__(self):
+        return "ValidatorIndex()"
+
+    def headers(self, url: str) -> dict | None:
+        """Conditional request headers for url, None if nothing committed yet"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        if not row:
+            return None
+        headers = {}
+        if row[0]:
+            headers["if-none-match"] = row[0]
+        if row[1]:
+            headers["if-modified-since"] = row[1]
+        return headers if headers else None
+
+    def seen(self, url: str, response_headers) -> None:
+        """Keep validators of a fresh (200) response, until its parsed result is committed"""
+        etag = response_headers.get("etag")
+        last_modified = response_headers.get("last-modified")
+        with self._lock:
+            if etag or last_modified:
+                self._pending[url] = (etag, last_modified)
+            else:
+                self._pending.pop(url, None)
+
+    def commit(self, url: str, result: dict) -> None:
+        """Store validators seen for url along with its parsed result"""
+        with self._lock:
+            validators = self._pending.pop(url, None)
+            if not validators:
+                return
+            with self.conn:
+                self.conn.execute(
+                    """INSERT INTO validators (url, etag, last_modified, result)
+                    VALUES(?,?,?,?)
+                    ON CONFLICT(url) DO UPDATE SET
+                    etag=excluded.etag, last_modified=excluded.last_modified,
+                    result=excluded.result""",
+                    (url, *validators, json.dumps(result)),
+                )
+
+    def result(self, url: str) -> dict | None:
+        """Previously parsed result of url"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT result FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        self.conn.close()
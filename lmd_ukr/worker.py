@@ -0,0 +1,145 @@
+"""
+Crawl worker : claims article / comments urls from a shared Frontier (leases), fetches them
+with its own Api instance (own credentials, own egress IP / host) and writes json files to a
+shared sink directory. Run as many workers as you have credentials / IPs :
+
+    python -m lmd_ukr.worker --frontier data/frontier.db --sink data --env .env.worker1
+    python -m lmd_ukr.worker --frontier data/frontier.db --sink data --env .env.worker2
+
+Offline (several local processes, no credentials) : --replay data/html_store
+Moved articles (301 / 308) are kept in --aliases (shared by workers, across runs)
+"""
+
+from pathlib import Path
+from dataclasses import asdict
+import argparse
+import json
+import logging
+import os
+import socket
+import time
+
+from dotenv import dotenv_values
+
+from .aliases import UrlAliases
+from .api import Api, Article
+from .frontier import Frontier
+from .metrics import Metrics
+from .store import HtmlStore
+
+
+def _dump(path: Path, obj: dict):
+    """Atomic json write, several workers share the sink"""
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as outfile:
+        json.dump(obj, outfile)
+    os.replace(tmp, path)
+
+
+def run(
+    api: Api,
+    frontier: Frontier,
+    sink: str | Path = "data",
+    kinds: tuple[str, ...] = ("article", "comments"),
+    tag: str | None = None,
+    batch: int = 10,
+    lease: float = 600,
+    worker: str | None = None,
+    wait: float | None = None,
+) -> dict:
+    """Claim & process batches of urls until the frontier is empty
+    (or poll every "wait" seconds, forever, if given), return number of urls done per kind
+    - article : save article json, queue its comments if allowed (and "tag" in keywords, if any)
+    - comments : save comments json
+    """
+    worker = worker if worker else f"{socket.gethostname()}-{os.getpid()}"
+    sink = Path(sink)
+    for folder in ("articles_ukraine", "comments_ukraine"):
+        (sink / folder).mkdir(parents=True, exist_ok=True)
+
+    processed = {kind: 0 for kind in kinds}
+    while True:
+        claimed_any = False
+        for kind in kinds:
+            claimed = frontier.claim(kind, n=batch, worker=worker, lease=lease)
+            claimed_any = claimed_any or bool(claimed)
+            for index, (url, payload) in enumerate(claimed):
+                frontier.renew([u for u, _ in claimed[index:]], kind, lease)
+                try:
+                    if kind == "article":
+                        article = api.get_article(url)
+                        if tag is None or tag in article.keywords:
+                            folder = sink / "articles_ukraine"
+                            _dump(
+                                folder / f"article_{article.article_id}.json",
+                                asdict(article),
+                            )
+                            if article.allow_comments:
+                                frontier.add(
+                                    [url], kind="comments", payload=asdict(article)
+                                )
+                    else:
+                        comments = api.get_comments(Article(**payload))
+                        folder = sink / "comments_ukraine"
+                        _dump(
+                            folder / f"comments_{comments.article_id}.json",
+                            asdict(comments),
+                        )
+                except Exception as e:
+                    logging.warning(f"{worker} {kind} {url} failed: {e!r}")
+                    frontier.fail(url, kind, error=repr(e), retry_in=lease)
+                    continue
+                frontier.done(url, kind)
+                processed[kind] += 1
+        if not claimed_any:
+            if wait is None:
+                return processed
+            time.sleep(wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lmd_ukr crawl worker")
+    parser.add_argument("--frontier", default="data/frontier.db")
+    parser.add_argument("--sink", default="data")
+    parser.add_argument("--aliases", default="data/aliases.db", help="moved urls db")
+    parser.add_argument("--env", default=".env", help="file with lmd_m, lmd_s cookies")
+    parser.add_argument("--replay", default=None, help="HtmlStore path, parse offline")
+    parser.add_argument("--kinds", default="article,comments")
+    parser.add_argument("--tag", default=None)
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--lease", type=float, default=600)
+    parser.add_argument("--worker", default=None)
+    parser.add_argument("--wait", type=float, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s:%(message)s", level=logging.INFO
+    )
+    if args.replay:
+        api = Api(store=HtmlStore(args.replay), replay=True, metrics=Metrics())
+    else:
+        credentials = dotenv_values(args.env)
+        api = Api(
+            lmd_m=credentials["lmd_m"],
+            lmd_s=credentials["lmd_s"],
+            metrics=Metrics(),
+            aliases=UrlAliases(args.aliases),
+        )
+    worker = args.worker if args.worker else f"{socket.gethostname()}-{os.getpid()}"
+    frontier = Frontier(args.frontier, worker=worker)
+    processed = run(
+        api,
+        frontier,
+        sink=args.sink,
+        kinds=tuple(args.kinds.split(",")),
+        tag=args.tag,
+        batch=args.batch,
+        lease=args.lease,
+        worker=worker,
+        wait=args.wait,
+    )
+    logging.info(f"done: {processed}, frontier: {frontier}, {api.metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -61,7 +61,7 @@ def main(**kwargs):
 
     # Get article's comments, this time our input param in an Article object
     coms = api.get_comments(article)
-    logging.info(f"Retrieved Comments with attr.: {coms.__dict__.keys()}")
+    logging.info(f"Retrieved Comments with attr.: {asdict(coms).keys()}")
     pprint(f"Comments for article {coms.article_id}: {coms}")
 
 